@@ -0,0 +1,97 @@
+"""Benchmarks sdu.autocomplete.write_bash_autocomplete() against the previous string concatenating generator, at 10k commands
+
+Run with ```python benchmarks/autocomplete_benchmark.py``` or ```nox -s benchmark```
+"""
+
+# Standard Library Dependencies
+import io                          # Used to stream output in memory
+import time                        # Used to time each implementation
+import logging                     # Used by the legacy implementation
+
+# Internal Dependencies
+from sdu.autocomplete import command, generate_bash_autocomplete, write_bash_autocomplete # Functionality being benchmarked
+
+
+def legacy_stringify_list(arguments:list) -> str:
+    """The implementation of _stringify_list() prior to the streaming renderer, kept for comparison"""
+    logging.info(f"Beginning list ({arguments})  stringification")
+    stringified = ""
+    for argument in arguments:
+        stringified += f" {argument}"
+    logging.debug(f"Stringified: {stringified}")
+    return stringified
+
+
+def legacy_generate_bash_autocomplete(root:str, commands:list) -> str:
+    """The implementation of generate_bash_autocomplete() prior to the streaming renderer, kept for comparison"""
+    sub_commands = [root]
+    for command in commands:
+        sub_commands.append(command.name)
+    arguments = ["-h", "--help", "-v", "--version"]
+    for command in commands:
+        for argument in command.arguments:
+            arguments.append(argument)
+
+    root_template = f"""_{root}()
+    {{
+        local cur
+        cur=\"${{COMP_WORDS[COMP_CWORD]}}\"
+
+        if [ $COMP_CWORD -eq 1 ]; then
+            COMPREPLY=( $( compgen -fW '{legacy_stringify_list(arguments)} {legacy_stringify_list(sub_commands)}' -- $cur) )
+        else
+            case ${{COMP_WORDS[1]}} in
+    """
+    for name in sub_commands:
+        root_template += f"""
+                {name})
+                _{root}_{name}
+            ;;
+        """
+    root_template += """
+            esac
+
+        fi
+    }
+    """
+    logging.debug(f"Root Template: {root_template}")
+    autocomplete_text = root_template
+
+    for command in commands:
+        logging.info(f"Beginning command autocomplete generation for command {command.name} with arguments {command.arguments}")
+        arguments = legacy_stringify_list(command.arguments) if command.arguments else " "
+        command_result = f"""_{root}_{command.name}()
+    {{
+        local cur
+        cur=\"${{COMP_WORDS[COMP_CWORD]}}\"
+
+        if [ $COMP_CWORD -ge 2 ]; then
+            COMPREPLY=( $( compgen -W '{arguments}' -- $cur) )
+        fi
+    }}
+    """
+        logging.debug(f"Command Result: {command_result}")
+        autocomplete_text += command_result
+
+    autocomplete_text += f"\ncomplete -o bashdefault -o default -o filenames -F _{root} {root}\n"
+    logging.debug(f"Autocomplete Text: {autocomplete_text}")
+    return autocomplete_text
+
+
+def time_function(function, repeats:int = 5) -> float:
+    """Returns the best time in seconds out of repeats runs of function"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    commands = [command(f"command{index}", [f"-{index}", f"--option{index}", f"--flag{index}"]) for index in range(10000)]
+    assert legacy_generate_bash_autocomplete("cli", commands) == generate_bash_autocomplete("cli", commands, write_file=False)
+
+    legacy = time_function(lambda: legacy_generate_bash_autocomplete("cli", commands))
+    current = time_function(lambda: write_bash_autocomplete("cli", commands, io.StringIO()))
+    print(f"10000 commands: legacy {legacy:6.3f}s | streaming {current:6.3f}s | {legacy / current:4.1f}x")
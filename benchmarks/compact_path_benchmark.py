@@ -0,0 +1,63 @@
+"""Benchmarks command lookup latency (shutil.which()) before and after sdu.paths.compact_path() on a synthetic PATH
+
+The synthetic PATH has 64 entries; 16 directories with executables, each listed twice, 16 missing
+directories and 16 empty directories. Lookups are timed for commands found late in PATH and for
+commands that aren't on PATH at all, since a miss checks every directory.
+
+Run with ```python benchmarks/compact_path_benchmark.py``` or ```nox -s benchmark```
+"""
+
+# Standard Library Dependencies
+import os                          # Used to build the synthetic PATH
+import time                        # Used to time each lookup
+import shutil                      # Used to look up commands the same way most tools do
+import tempfile                    # Used to create the synthetic PATH somewhere disposable
+
+# Internal Dependencies
+from sdu.paths import compact_path # Functionality being benchmarked
+
+
+def build_path(root:str, directories:int = 16, executables:int = 20) -> list:
+    """Creates the synthetic PATH directories under root, returning them in PATH order"""
+    path = []
+    for directory_index in range(directories):
+        directory = os.path.join(root, f"bin{directory_index}")
+        os.mkdir(directory)
+        for executable_index in range(executables):
+            executable = os.path.join(directory, f"command{directory_index}-{executable_index}")
+            open(executable, "w").close()
+            os.chmod(executable, 0o755)
+        empty = os.path.join(root, f"empty{directory_index}")
+        os.mkdir(empty)
+        path.extend([directory, os.path.join(root, f"missing{directory_index}"), empty])
+    return path + path[::3] # Every directory with executables is listed a second time
+
+
+def time_lookups(commands:list, path:str, repeats:int = 5) -> float:
+    """Returns the best average time in microseconds out of repeats runs of looking up every command"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for command in commands:
+            shutil.which(command, path=path)
+        timings.append((time.perf_counter() - start) / len(commands))
+    return min(timings) * 1e6
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as root:
+        path = build_path(root)
+        previous_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = os.pathsep.join(path)
+        try:
+            compacted = compact_path(apply=False)
+        finally:
+            os.environ["PATH"] = previous_path
+        print(f"PATH entries: {len(path)} before | {len(compacted)} after")
+
+        found = [f"command15-{index}" for index in range(20)] # In the last directory
+        missing = [f"missing-command{index}" for index in range(20)]
+        for label, commands in (("found", found), ("missing", missing)):
+            before = time_lookups(commands, os.pathsep.join(path))
+            after = time_lookups(commands, os.pathsep.join(compacted))
+            print(f"{label:>7} lookups: before {before:7.1f}us | after {after:7.1f}us | {before / after:4.1f}x")
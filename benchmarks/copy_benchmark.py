@@ -0,0 +1,59 @@
+"""Benchmarks sdu.cli.copy_directory() and sdu.cli.sync_directory() against shutil.copytree()
+
+The synthetic tree has 100 directories of 100 files (4KB each) and 10 files of 8MB. Times are
+reported for a fresh copy, and for re-copying into an up to date destination (where
+sync_directory() can skip every file).
+
+Run with ```python benchmarks/copy_benchmark.py``` or ```nox -s benchmark```
+"""
+
+# Standard Library Dependencies
+import os                          # Used to build the synthetic tree
+import time                        # Used to time each implementation
+import shutil                      # Used by the previous implementation
+import tempfile                    # Used to create the synthetic tree somewhere disposable
+
+# Internal Dependencies
+from sdu.cli import copy_directory, sync_directory, remove_directory # Functionality being benchmarked
+
+
+def build_tree(root:str, directories:int = 100, files:int = 100, large_files:int = 10):
+    """Creates directories * files small files, and large_files 8MB files under root"""
+    content = os.urandom(4096)
+    for directory_index in range(directories):
+        directory = os.path.join(root, f"directory{directory_index}")
+        os.makedirs(directory)
+        for file_index in range(files):
+            with open(os.path.join(directory, f"file{file_index}"), "wb") as small_file:
+                small_file.write(content)
+    for file_index in range(large_files):
+        with open(os.path.join(root, f"large{file_index}"), "wb") as large_file:
+            large_file.write(os.urandom(8 * 2 ** 20))
+
+
+def time_copy(function, source:str, destination:str, fresh:bool) -> float:
+    """Returns the time in seconds function takes to copy source to destination"""
+    if fresh and os.path.exists(destination):
+        remove_directory(destination)
+    start = time.perf_counter()
+    function(source, destination)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as root:
+        source = os.path.join(root, "source")
+        build_tree(source)
+        implementations = (
+            ("copytree", lambda source, destination: shutil.copytree(source, destination, dirs_exist_ok=True)),
+            ("copy_directory", lambda source, destination: copy_directory(source, destination, dirs_exist_ok=True)),
+            ("sync_directory", sync_directory),
+        )
+        for label, fresh in (("fresh copy", True), ("up to date", False)):
+            timings = []
+            for name, function in implementations:
+                destination = os.path.join(root, name)
+                if not fresh: # Make sure the destination is up to date first
+                    time_copy(function, source, destination, True)
+                timings.append(f"{name} {time_copy(function, source, destination, fresh):6.3f}s")
+            print(f"{label:>10}: {' | '.join(timings)}")
@@ -0,0 +1,52 @@
+"""Benchmarks the scandir based expansion in sdu.paths.postprocess_paths() against glob.glob() + os.path.isdir()
+
+Run with ```python benchmarks/glob_benchmark.py``` or ```nox -s benchmark```
+"""
+
+# Standard Library Dependencies
+import os                          # Used to build the synthetic tree and check directories
+import glob                        # Used by the previous implementation
+import time                        # Used to time each implementation
+import tempfile                    # Used to create the synthetic tree somewhere disposable
+
+# Internal Dependencies
+from sdu.paths import postprocess_paths # Functionality being benchmarked
+
+
+def build_tree(root:str, directories:int = 100, entries:int = 1000):
+    """Creates directories * entries entries under root, half of them folders and half files"""
+    for directory_index in range(directories):
+        directory = os.path.join(root, f"directory{directory_index}")
+        os.mkdir(directory)
+        for entry_index in range(entries):
+            path = os.path.join(directory, f"entry{entry_index}")
+            if entry_index % 2:
+                os.mkdir(path)
+            else:
+                open(path, "w").close()
+
+
+def legacy_expand(pattern:str) -> list:
+    """The previous expansion in postprocess_paths(), glob then stat every match"""
+    return [path for path in glob.glob(pattern) if os.path.isdir(path)]
+
+
+def time_function(function, pattern:str, repeats:int = 5) -> float:
+    """Returns the best time in seconds out of repeats runs of function on pattern"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(pattern)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root)
+        pattern = os.path.join(root, "*", "*")
+        assert postprocess_paths([pattern]) == legacy_expand(pattern)
+
+        legacy = time_function(legacy_expand, pattern)
+        current = time_function(lambda pattern: postprocess_paths([pattern]), pattern)
+        print(f"100k entries: glob + isdir {legacy:6.3f}s | scandir {current:6.3f}s | {legacy / current:4.1f}x")
@@ -0,0 +1,83 @@
+"""Benchmarks sdu.paths.preprocess_paths() against the previous regex-join/index implementation
+
+Run with ```python benchmarks/preprocess_benchmark.py``` or ```nox -s benchmark```
+"""
+
+# Standard Library Dependencies
+import os                          # Used to grab the HOME environment variable
+import re                          # Used by the legacy implementation
+import time                        # Used to time each implementation
+import random                      # Used to generate synthetic paths
+
+# Internal Dependencies
+from sdu.paths import preprocess_paths, canonicalize_path # Functionality being benchmarked, and its cache
+
+
+def legacy_preprocess_paths(paths:list) -> list:
+    """The implementation of preprocess_paths() prior to the single pass normalizer, kept for comparison"""
+    result = list(paths)
+
+    for index, directory in enumerate(result):
+        directory = directory.strip()
+        if directory.startswith(".") and (len(directory) > 1):
+            directory = os.path.abspath(directory)
+        if not directory.startswith("~"):
+            if not os.name == "nt":
+                directory = directory.replace(os.getenv('HOME'),"~")
+        directory = directory.replace("\\", "/")
+        result[index] = directory
+
+    regex = r"([A-Z]:/Users/.*)"
+    matches = re.finditer(regex, "\n".join(result), re.MULTILINE | re.IGNORECASE)
+    matches = [match.group() for match in matches]
+    for path in matches:
+        path_index = result.index(path)
+        path = path.split("/")[2::]
+        path[0] = "~"
+        result[path_index] = "/".join(path)
+
+    return result
+
+
+def synthetic_paths(amount:int) -> list:
+    """Generates a mix of windows, *nix, home and relative style paths"""
+    random.seed(amount)
+    home = os.getenv("HOME", "/home/user")
+    templates = [
+        "C:\\Users\\Kieran\\Desktop\\Development\\project{}\\*",
+        "~\\Desktop\\Development\\Personal\\noter{}",
+        home + "/Documents/work/{}",
+        "./relative/folder{}",
+        "/usr/share/lib{}/*",
+    ]
+    return [random.choice(templates).format(index) for index in range(amount)]
+
+
+def time_function(function, paths:list) -> float:
+    """Returns how long in seconds it took to run function on paths"""
+    start = time.perf_counter()
+    function(paths)
+    return time.perf_counter() - start
+
+
+def time_cold_and_warm(paths:list) -> tuple:
+    """Returns how long in seconds preprocess_paths() took with an empty cache, and then with the cache it filled"""
+    canonicalize_path.cache_clear()
+    cold = time_function(preprocess_paths, paths)
+    warm = time_function(preprocess_paths, paths)
+    return cold, warm
+
+
+if __name__ == "__main__":
+    # Paths are repeated with the cache being cleared first, so cold runs aren't served by an earlier warm run
+    for amount in (1_000, 10_000, 50_000):
+        paths = synthetic_paths(amount)
+        legacy = time_function(legacy_preprocess_paths, paths)
+        cold, warm = time_cold_and_warm(paths)
+        print(f"{amount:>9} paths: legacy {legacy:8.3f}s | cold {cold:8.3f}s ({legacy / cold:6.1f}x) | warm {warm:8.3f}s ({legacy / warm:6.1f}x)")
+        assert preprocess_paths(paths) == legacy_preprocess_paths(paths)
+
+    # The legacy implementation is quadratic, so only the current one is run at 10^6
+    paths = synthetic_paths(1_000_000)
+    cold, warm = time_cold_and_warm(paths)
+    print(f"{1_000_000:>9} paths: cold {cold:8.3f}s | warm {warm:8.3f}s")
@@ -1,3 +1,4 @@
+import glob
 import nox
 from sdu.validation import confirm
 
@@ -40,4 +41,12 @@ def docs(session):
     # Serve documentation to verify it's how you want
     session.install(".") # install SDU
     session.install("pdoc3")
-    session.run("pdoc3", "sdu", "--http", "localhost:8080")
\ No newline at end of file
+    session.run("pdoc3", "sdu", "--http", "localhost:8080")
+
+
+@nox.session
+def benchmark(session):
+    """Runs the performance benchmarks defined in the benchmarks folder"""
+    session.install(".")
+    for benchmark_file in sorted(glob.glob("benchmarks/*_benchmark.py")):
+        session.run("python", benchmark_file)
@@ -5,7 +5,32 @@ Module Variables
 
 command (namedtuple):
     Defines the schema for commands that is used
-    to generate autocomplete files.
+    to generate autocomplete files. Commands can
+    have their own (nested) subcommands, and a dict
+    of values that each argument can be completed with.
+
+provider (namedtuple):
+    A shell command that prints the values of an
+    argument (one per line), cached for ttl seconds.
+    Used in place of a list of values in command.values.
+
+Functions
+---------
+
+generate_bash_autocomplete -> str:
+    Takes a list of commands and returns (and optionally writes) the text of a bash autocomplete file
+
+write_bash_autocomplete:
+    Takes a list of commands and streams the text of a bash autocomplete file to any writable object
+
+generate_bash_value_files -> dict:
+    Takes a list of commands and returns (and optionally writes) the sorted files of their large value sets
+
+precompute_bash_providers -> list:
+    Takes a list of commands and runs their providers, filling the caches their completions are read from
+
+generate_lazy_bash_autocomplete -> dict:
+    Takes a list of commands and returns (and optionally writes) a small root autocomplete file, plus one file per command that's only loaded when it's first completed
 
 Examples
 --------
@@ -24,14 +49,91 @@ commands =  [ # Used for autocompletion generation
 generate_bash_autocomplete(root, commands)
 print(f"Bash autocompletion file written to /etc/bash_completion.d/{root}.sh \nPlease restart shell for autocomplete to update")
 ```
+
+### Stream a bash autocomplete file for a large CLI to stdout
+```
+import sys
+from sdu.autocomplete import write_bash_autocomplete, command
+
+commands = [command(f"command{index}", [f"--option{index}"]) for index in range(10000)]
+
+write_bash_autocomplete('command', commands, sys.stdout)
+```
+
+### Generate bash autocomplete file for a command with nested subcommands
+```
+from sdu.autocomplete import generate_bash_autocomplete, command
+
+commands = [
+    command("remote", ["-v", "--verbose"], [ # Completes: command remote add|remove|-v|--verbose
+        command("add", ["-f", "--fetch"]),
+        command("remove", []),
+    ]),
+    command("status", ["-s", "--short"])
+]
+
+generate_bash_autocomplete('command', commands)
+```
+
+### Generate bash autocomplete file for a command with arguments that take values
+```
+from sdu.autocomplete import generate_bash_autocomplete, command
+
+with open("hosts.txt") as hosts_file: # Large sets are written to sorted files next to the autocomplete file
+    hosts = hosts_file.read().split()
+
+commands = [
+    command("ssh", ["--host", "--color"], values={"--host": hosts, "--color": ["auto", "always", "never"]})
+]
+
+generate_bash_autocomplete('command', commands)
+```
+
+### Generate bash autocomplete file with values that come from running a command
+```
+from sdu.autocomplete import generate_bash_autocomplete, precompute_bash_providers, command, provider
+
+commands = [ # Completed from a cache file, refreshed in the background once it's older than 10 minutes
+    command("deploy", ["--branch"], values={"--branch": provider("git branch --format='%(refname:short)'", ttl=600)})
+]
+
+generate_bash_autocomplete('command', commands)
+precompute_bash_providers('command', commands) # So the first completion doesn't need to wait for a refresh
+```
+
+### Generate lazy loaded bash autocomplete files for a large CLI, without root
+```
+import os
+from sdu.autocomplete import generate_lazy_bash_autocomplete, command
+
+commands = [command(f"command{index}", [f"--option{index}"]) for index in range(10000)]
+
+output_dir = os.path.expanduser("~/.local/share/bash-completion/completions")
+files = generate_lazy_bash_autocomplete('command', commands, output_dir=output_dir)
+print(f"Wrote {len(files)} files, add `source {output_dir}/command.sh` to ~/.bashrc")
+```
 """
 
 # Standard lib dependencies
 
+import os                             # Used to build the paths of autocomplete files
+import io                             # Used to render autocomplete files in memory
+import time                           # Used to set when cached values expire
+import shlex                          # Used to quote provider commands in bash
+import tempfile                       # Used to replace cache files atomically
+import subprocess                     # Used to run providers
 import logging                        # Used to log valueable logging info
 from collections import namedtuple    # Used to setup command schema for feeding autocomplete
+from typing import Iterator, Iterable, Optional, TextIO # Used to type hint streamed output & values
+
+command = namedtuple("command", ["name", "arguments", "subcommands", "values"])
+command.__new__.__defaults__ = ((), None) # namedtuple(defaults=) is only available in 3.7+
 
-command = namedtuple("command", ["name", "arguments"])
+provider = namedtuple("provider", ["command", "ttl"])
+provider.__new__.__defaults__ = (3600,)
+
+# Value sets larger than this are written to sorted files instead of inlined in the completion functions
+_INLINE_VALUES_LIMIT = 256
 
 
 def _generate_root_autocomplete(root:str, commands:list , arguments:list) -> str:
@@ -52,34 +154,41 @@ def _generate_root_autocomplete(root:str, commands:list , arguments:list) -> str
         The autocomplete section for the root command
     """    
     logging.info("Beginning bash root command autocomplete generation")
-    arguments = _stringify_list(arguments)
+    return "".join(_iter_root_autocomplete(root, commands, arguments))
+
 
-    root_template = f"""_{root}()
+def _iter_root_autocomplete(root:str, commands:list , arguments:list) -> Iterator[str]:
+    """Generates the first portion of a bash autocomplete file one fragment at a time, see _generate_root_autocomplete()
+
+    Yields
+    ------
+    str
+        Each fragment of the autocomplete section for the root command, in order
+    """
+    yield f"""_{root}()
     {{
         local cur
         cur=\"${{COMP_WORDS[COMP_CWORD]}}\"
 
         if [ $COMP_CWORD -eq 1 ]; then
-            COMPREPLY=( $( compgen -fW '{arguments} {_stringify_list(commands)}' -- $cur) )
+            COMPREPLY=( $( compgen -fW '{_stringify_list(arguments)} {_stringify_list(commands)}' -- $cur) )
         else
             case ${{COMP_WORDS[1]}} in
     """
 
     for command in commands:
-        root_template += f"""
+        yield f"""
                 {command})
                 _{root}_{command}
             ;;
         """
 
-    root_template+="""
+    yield """
             esac
 
         fi
     }
     """
-    logging.debug(f"Root Template: {root_template}")
-    return root_template
 
 
 def _generate_command_autocomplete(root:str, command:str, arguments:list) -> str:
@@ -99,7 +208,7 @@ def _generate_command_autocomplete(root:str, command:str, arguments:list) -> str
     str
         The autocomplete section for the command
     """    
-    logging.info(f"Beginning command autocomplete generation for command {command} with arguments {arguments}")
+    logging.info(f"Beginning command autocomplete generation for command {command}")
 
     if arguments:
         arguments = _stringify_list(arguments)
@@ -115,10 +224,311 @@ def _generate_command_autocomplete(root:str, command:str, arguments:list) -> str
         fi
     }}
     """
-    logging.debug(f"Command Result: {command_result}")
     return command_result
 
 
+def _iter_nested_autocomplete(function:str, start:str, arguments:list, subcommands:list, values:Optional[dict] = None, values_dir:str = "") -> Iterator[str]:
+    """Generates the bash function for a command (and its subcommands recursively) one fragment at a time
+
+    Parameters
+    ----------
+    function : str
+        The name of the bash function for the command, subcommands append __<name> to it
+    start : str
+        The bash expression for the position of the first word after the command
+    arguments : list
+        The arguments that are possible for the command
+    subcommands : list
+        The subcommands (namedtuple type) of the command
+    values : dict or None
+        Maps the arguments of the command that take a value to the values they can be completed with
+    values_dir : str
+        The absolute path to the folder with the files of large value sets
+
+    Yields
+    ------
+    str
+        Each fragment of the functions for the command and its subcommands, in order
+    """
+    yield f"""{function}()
+{{
+    local cur=\"${{COMP_WORDS[COMP_CWORD]}}\"
+"""
+    if subcommands: # Hand off to the first subcommand typed after this command
+        yield f"""    local i
+    for (( i={start}; i < COMP_CWORD; i++ )); do
+        case \"${{COMP_WORDS[i]}}\" in
+"""
+        for subcommand in subcommands:
+            yield f"""            {subcommand.name}) {function}__{subcommand.name} $(( i + 1 )); return;;
+"""
+        yield """        esac
+    done
+"""
+    if values: # Complete the value of the argument before the cursor
+        yield """    case \"${COMP_WORDS[COMP_CWORD-1]}\" in
+"""
+        for argument, argument_values in values.items():
+            if isinstance(argument_values, provider):
+                yield f"""        {argument}) _sdu_complete_cached \"{function}{argument}\" {int(argument_values.ttl)} {shlex.quote(argument_values.command)} \"$cur\"; return;;
+"""
+                continue
+            argument_values = _unique_values(argument_values)
+            if len(argument_values) > _INLINE_VALUES_LIMIT:
+                yield f"""        {argument}) _sdu_complete_values \"{values_dir}/{function}{argument}\" \"$cur\"; return;;
+"""
+            else:
+                yield f"""        {argument}) COMPREPLY=( $( compgen -W '{_stringify_list(argument_values)}' -- \"$cur\" ) ); return;;
+"""
+        yield """    esac
+"""
+    yield f"""    COMPREPLY=( $( compgen -W '{_stringify_list(list(arguments) + [subcommand.name for subcommand in subcommands])}' -- \"$cur\" ) )
+}}
+"""
+    for subcommand in subcommands:
+        yield from _iter_nested_autocomplete(f"{function}__{subcommand.name}", "$1", subcommand.arguments, subcommand.subcommands, subcommand.values, values_dir)
+
+
+def generate_bash_value_files(root:str, commands:list, output_dir:str = "/etc/bash_completion.d", write_files:bool = True) -> dict:
+    """Takes a list of commands (namedtuple type) and returns the text of the files bash completes their large value sets from
+
+    Value sets with more than 256 values are each written to a sorted file of values (one per line) in
+    <output_dir>/<root>.d/values/<function><argument>, which bash binary searches for the current word,
+    so completing a value only costs as much as the values that share its prefix, however long that
+    prefix is, instead of reading the whole set.
+
+    Parameters
+    ----------
+    root: (str)
+        The string signifying the base programs name
+
+    commands: (list[namedtuple])
+        A list of the commands to generate the value files for
+
+    output_dir: (str)
+        The directory the autocomplete file is in, default is /etc/bash_completion.d (which needs root)
+
+    write_files: (bool)
+        When true will write the files, default is True
+
+    Notes
+    -----
+    - Values can't contain whitespace, since bash splits completion words on it
+    - Files are searched with look when it's installed, otherwise they're read into bash and searched there
+
+    Returns
+    -------
+    dict[str, str]:
+        Maps the path of each value file to its text, empty if there are no large value sets
+    """
+    values_dir = os.path.join(os.path.abspath(output_dir), f"{root}.d", "values")
+    files = {}
+    for function, argument, argument_values in _iter_value_sets(root, commands):
+        if isinstance(argument_values, provider):
+            continue
+        argument_values = _unique_values(argument_values)
+        if len(argument_values) > _INLINE_VALUES_LIMIT: # Sorted by code point, the same order as the byte order look and bash search with
+            files[os.path.join(values_dir, f"{function}{argument}")] = "\n".join(argument_values) + "\n"
+
+    if write_files:
+        for file_path, text in files.items():
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w", encoding="utf-8") as value_file:
+                value_file.write(text)
+    logging.info(f"Generated {len(files)} value files")
+    return files
+
+
+def _unique_values(values:Iterable[str]) -> list:
+    """Returns the sorted, deduplicated, non-empty values of a value set"""
+    return sorted({str(value) for value in values if value})
+
+
+def precompute_bash_providers(root:str, commands:list, stale_only:bool = False) -> list:
+    """Takes a list of commands (namedtuple type) and runs their providers, filling the caches their completions are read from
+
+    Completions for a provider only ever read its cache file, refreshing it in the background when it
+    has expired, so nothing is completed until the first refresh finishes. Running this (i.e. when
+    installing the CLI) means the values are there for the first completion.
+
+    Parameters
+    ----------
+    root: (str)
+        The string signifying the base programs name
+
+    commands: (list[namedtuple])
+        A list of the commands to run the providers of
+
+    stale_only: (bool)
+        When true only providers with a missing or expired cache are run, default is False
+
+    Notes
+    -----
+    - Caches are kept in ${XDG_CACHE_HOME:-$HOME/.cache}/sdu/completions, the first line of each being when it expires (in seconds since the epoch)
+    - Providers are run with the shell, the same way the generated completions run them
+
+    Raises
+    ------
+    subprocess.CalledProcessError:
+        If a provider exits with an error, the caches of the providers before it are still written
+
+    Returns
+    -------
+    list[str]:
+        The paths of the cache files that were written
+    """
+    cache_dir = _provider_cache_dir()
+    written = []
+    for function, argument, argument_values in _iter_value_sets(root, commands):
+        if not isinstance(argument_values, provider):
+            continue
+        cache_path = os.path.join(cache_dir, f"{function}{argument}")
+        if stale_only:
+            try:
+                with open(cache_path) as cache_file:
+                    if int(cache_file.readline()) > time.time():
+                        continue
+            except (OSError, ValueError): # Missing or corrupt
+                pass
+        values = subprocess.run(argument_values.command, shell=True, stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+
+        os.makedirs(cache_dir, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=cache_dir, prefix=f".{function}{argument}.")
+        with os.fdopen(file_descriptor, "w") as cache_file:
+            cache_file.write(f"{int(time.time() + argument_values.ttl)}\n{values}")
+        os.replace(temporary_path, cache_path)
+        written.append(cache_path)
+    logging.info(f"Precomputed {len(written)} provider caches")
+    return written
+
+
+def _provider_cache_dir() -> str:
+    """Returns the folder provider caches are kept in, matching the generated bash"""
+    return os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "sdu", "completions")
+
+
+def _iter_value_sets(root:str, commands:list) -> Iterator[tuple]:
+    """Finds the value sets of every command and subcommand
+
+    Yields
+    ------
+    tuple[str, str, Iterable or provider]
+        The bash function of the command, the argument, and the values of the argument
+    """
+    pending = [(f"_{root}__{command.name}", command) for command in reversed(commands)]
+    while pending:
+        function, current_command = pending.pop()
+        for argument, argument_values in (current_command.values or {}).items():
+            yield function, argument, argument_values
+        pending.extend((f"{function}__{subcommand.name}", subcommand) for subcommand in reversed(current_command.subcommands))
+
+
+def _generate_values_autocomplete(root:str, commands:list) -> str:
+    """Generates the bash functions that complete values from the files of large value sets, and from provider caches
+
+    Notes
+    -----
+    The functions are the same for every CLI, so it's safe for autocomplete files of different CLI's to each define them
+
+    Returns
+    -------
+    str
+        The functions needed by the value sets of the commands (empty if there are none), called as
+        _sdu_complete_values <value file> <current word> and
+        _sdu_complete_cached <cache name> <ttl> <provider command> <current word>
+    """
+    large = cached = False
+    for _, _, argument_values in _iter_value_sets(root, commands):
+        if isinstance(argument_values, provider):
+            cached = True
+        elif len(_unique_values(argument_values)) > _INLINE_VALUES_LIMIT:
+            large = True
+
+    functions = ""
+    if cached: # Reads the cache directly, refreshing it in a detached background job (guarded by a lock folder) when it has expired,
+               # a lock older than 10 minutes was left by a refresh that was killed (i.e. on shutdown) and is taken over
+        functions += """_sdu_complete_cached()
+{
+    local cache="${XDG_CACHE_HOME:-$HOME/.cache}/sdu/completions/$1" ttl="$2" refresh="$3" cur="$4" expiry=0 now="${EPOCHSECONDS:-$(date +%s)}"
+    local -a words
+    if [ -f "$cache" ]; then
+        read -r expiry < "$cache"
+        [[ "$expiry" =~ ^[0-9]+$ ]] || expiry=0
+        mapfile -t -s 1 words < "$cache"
+        COMPREPLY=( $( compgen -W "${words[*]}" -- "$cur" ) )
+    fi
+    if (( expiry <= now )) && mkdir -p "${cache%/*}" 2> /dev/null && { mkdir "$cache.lock" ||
+        { [ -n "$(find "$cache.lock" -maxdepth 0 -mmin +10)" ] && rmdir "$cache.lock" && mkdir "$cache.lock"; }; } 2> /dev/null; then
+        ( (
+            trap 'rmdir "$cache.lock"' EXIT
+            { echo $(( now + ttl )); eval "$refresh"; } > "$cache.$BASHPID" && mv -f "$cache.$BASHPID" "$cache" || rm -f "$cache.$BASHPID"
+        ) > /dev/null 2>&1 < /dev/null & )
+    fi
+}
+"""
+    if not large:
+        return functions
+    # Finds the values starting with the current word by binary searching the sorted file (byte order, hence LC_ALL=C),
+    # with look when it's installed, otherwise in bash after reading the file
+    return functions + """_sdu_complete_values()
+{
+    local file="$1" cur="$2" LC_ALL=C low=0 high middle
+    local -a words
+    COMPREPLY=()
+    [ -f "$file" ] || return
+    if type -P look > /dev/null; then
+        mapfile -t COMPREPLY < <( LC_ALL=C look -- "$cur" "$file" )
+        return
+    fi
+    mapfile -t words < "$file"
+    high=${#words[@]}
+    while (( low < high )); do
+        middle=$(( (low + high) / 2 ))
+        if [[ "${words[middle]}" < "$cur" ]]; then low=$(( middle + 1 )); else high=$middle; fi
+    done
+    while (( low < ${#words[@]} )) && [[ "${words[low]}" == "$cur"* ]]; do
+        COMPREPLY+=( "${words[low++]}" )
+    done
+}
+"""
+
+
+def _iter_lazy_root_autocomplete(root:str, commands:list, command_dir:str) -> Iterator[str]:
+    """Generates the root function of lazy loaded bash autocomplete files one fragment at a time, see generate_lazy_bash_autocomplete()
+
+    Parameters
+    ----------
+    root : str
+        The root command name
+    commands : list
+        The commands (namedtuple type) of the root command
+    command_dir : str
+        The absolute path to the folder with the file for each command
+
+    Yields
+    ------
+    str
+        Each fragment of the root function, in order
+    """
+    yield f"""_{root}()
+{{
+    local cur=\"${{COMP_WORDS[COMP_CWORD]}}\"
+    local i
+    for (( i=1; i < COMP_CWORD; i++ )); do
+        case \"${{COMP_WORDS[i]}}\" in
+"""
+    if commands: # Load the command's functions the first time it's completed
+        yield f"""            {"|".join(command.name for command in commands)})
+                declare -F \"_{root}__${{COMP_WORDS[i]}}\" > /dev/null || source \"{command_dir}/${{COMP_WORDS[i]}}.sh\"
+                \"_{root}__${{COMP_WORDS[i]}}\" $(( i + 1 )); return;;
+"""
+    yield f"""        esac
+    done
+    COMPREPLY=( $( compgen -W '{_stringify_list(["-h", "--help", "-v", "--version"] + [command.name for command in commands])}' -- \"$cur\" ) )
+}}
+"""
+
+
 def _stringify_list(arguments:list) -> str:
     """Takes a list and stringifies it to a useable format for autocomplete files
 
@@ -135,22 +545,16 @@ def _stringify_list(arguments:list) -> str:
     Examples
     --------
     ```
-    >> _stringify_list(["-a", "--api", "-o", "--offline"]) # Returns: '-a --api -o --offline' 
+    >> _stringify_list(["-a", "--api", "-o", "--offline"]) # Returns: ' -a --api -o --offline' 
     ```
     """
-    logging.info(f"Beginning list ({arguments})  stringification")
     if not (type(arguments) == list or type(arguments) == tuple):
         raise ValueError("Expected list of arguments, got string instead")
 
-    stringified = ""
-
-    for argument in arguments: # Preprocess arguments into appropriate string form
-        stringified += f" {argument}"
-    logging.debug(f"Stringified: {stringified}")
-    return stringified
+    return "".join([f" {argument}" for argument in arguments]) # Preprocess arguments into appropriate string form
 
 
-def generate_bash_autocomplete(root:str, commands:list, write_file:bool = True) -> str:
+def generate_bash_autocomplete(root:str, commands:list, write_file:bool = True, nested:bool = False, output_dir:str = "/etc/bash_completion.d") -> str:
     """Takes a list of commands (namedtuple type) and returns the text necessary for a bash autocomplete file
 
     Parameters
@@ -164,6 +568,12 @@ def generate_bash_autocomplete(root:str, commands:list, write_file:bool = True)
     write_file: (bool)
         When true will write a file to path that bash looks for autocomplete files, default is True
 
+    nested: (bool)
+        Whether to generate per level case dispatch even if no commands have subcommands, see write_bash_autocomplete()
+
+    output_dir: (str)
+        The directory to write the file (and the files of large value sets) to, default is /etc/bash_completion.d (which needs root)
+
     Returns
     -------
     str:
@@ -188,30 +598,173 @@ def generate_bash_autocomplete(root:str, commands:list, write_file:bool = True)
     ```
     """
     logging.info("Beginning bash autocompletion generation")
+    autocomplete_text = io.StringIO()
+    write_bash_autocomplete(root, commands, autocomplete_text, nested, output_dir)
+    autocomplete_text = autocomplete_text.getvalue()
+
+    if write_file:
+        with open(os.path.join(output_dir, f"{root}.sh"), "w") as autocomplete_file:
+                    autocomplete_file.write(autocomplete_text)
+        generate_bash_value_files(root, commands, output_dir)
+
+    return autocomplete_text
+
+
+def generate_lazy_bash_autocomplete(root:str, commands:list, output_dir:str = "/etc/bash_completion.d", write_files:bool = True) -> dict:
+    """Takes a list of commands (namedtuple type) and returns the text of lazy loaded bash autocomplete files
+
+    Bash parses every autocomplete file when a shell starts, so instead of one file with a function
+    for every command this generates a small root file, and a file per command in a <root>.d folder
+    next to it. The root file only completes the commands themselves, and sources a command's file
+    the first time the command is completed.
+
+    Parameters
+    ----------
+    root: (str)
+        The string signifying the base programs name
+
+    commands: (list[namedtuple])
+        A list of the commands to generate the autocomplete files for
+
+    output_dir: (str)
+        The directory to write the root file to (with the command files in <output_dir>/<root>.d), default is /etc/bash_completion.d (which needs root)
+
+    write_files: (bool)
+        When true will write the files to output_dir, default is True
+
+    Notes
+    -----
+    - The command files use the same per level case dispatch as nested autocompletion, see write_bash_autocomplete()
+    - The root file sources command files from the absolute path of output_dir, so regenerate the files if they're moved
+
+    Examples
+    --------
+    Generate lazy loaded bash autocomplete files for a command called 'command' in the current directory
+
+    ```
+    from sdu.autocomplete import generate_lazy_bash_autocomplete, command
+
+    commands =  [
+        command("docs", ["-a", "--api", "-o", "--offline"]),
+        command("register", [])
+    ]
+
+    files = generate_lazy_bash_autocomplete('command', commands, output_dir=".")
+    print(list(files)) # Prints: ['/path/to/command.sh', '/path/to/command.d/docs.sh', '/path/to/command.d/register.sh']
+    ```
+
+    Returns
+    -------
+    dict[str, str]:
+        Maps the path of each file to its text, the root file first and the files of large value sets (see generate_bash_value_files()) last
+    """
+    logging.info("Beginning lazy bash autocompletion generation")
 
     if not type(commands) == list:
         raise ValueError("Expected list of commands, got string instead")
 
-    sub_commands = [root] # list of just top level sub-commands
-    for command in commands: # Iterate through and pull just subcommands from commands list
-        sub_commands.append(command.name)
+    output_dir = os.path.abspath(output_dir)
+    command_dir = os.path.join(output_dir, f"{root}.d")
 
-    arguments = ["-h", "--help", "-v", "--version"]
-    for command in commands:
-        for argument in command.arguments:
-            arguments.append(argument)
-    
-    autocomplete_text = _generate_root_autocomplete(root, sub_commands, arguments)
+    root_text = io.StringIO()
+    root_text.write(_generate_values_autocomplete(root, commands))
+    for fragment in _iter_lazy_root_autocomplete(root, commands, command_dir):
+        root_text.write(fragment)
+    root_text.write(f"\ncomplete -o bashdefault -o default -o filenames -F _{root} {root}\n")
+    files = {os.path.join(output_dir, f"{root}.sh"): root_text.getvalue()}
 
     for command in commands:
-        autocomplete_text += _generate_command_autocomplete(root, command.name, command.arguments)
+        files[os.path.join(command_dir, f"{command.name}.sh")] = "".join(_iter_nested_autocomplete(f"_{root}__{command.name}", "$1", command.arguments, command.subcommands, command.values, os.path.join(command_dir, "values")))
+    files.update(generate_bash_value_files(root, commands, output_dir, write_files=False))
 
-    autocomplete_text += f"\ncomplete -o bashdefault -o default -o filenames -F _{root} {root}\n"
+    if write_files:
+        os.makedirs(command_dir, exist_ok=True)
+        for file_path, text in files.items():
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as autocomplete_file:
+                autocomplete_file.write(text)
 
-    logging.debug(f"Autocomplete Text: {autocomplete_text}")
+    logging.info(f"Generated lazy bash autocompletion for {len(commands)} commands")
+    return files
 
-    if write_file:
-        with open(f"/etc/bash_completion.d/{root}.sh", "w") as autocomplete_file:
-                    autocomplete_file.write(autocomplete_text)
 
-    return autocomplete_text
+def write_bash_autocomplete(root:str, commands:list, stream:TextIO, nested:bool = False, output_dir:str = "/etc/bash_completion.d") -> None:
+    """Takes a list of commands (namedtuple type) and writes a bash autocomplete file to stream one fragment at a time
+
+    This produces the same text as generate_bash_autocomplete(), without building the whole script
+    in memory first, so it stays fast for CLI's with thousands of commands.
+
+    Parameters
+    ----------
+    root: (str)
+        The string signifying the base programs name
+
+    commands: (list[namedtuple])
+        A list of the commands to generate the autocomplete file for
+
+    stream: (TextIO)
+        Anything with a write() method that accepts strings (open file, io.StringIO, sys.stdout, a pipe etc.)
+
+    nested: (bool)
+        Whether to generate per level case dispatch even if no commands have subcommands or values
+
+    output_dir: (str)
+        The directory the autocomplete file will be in, large value sets are read from <output_dir>/<root>.d/values
+
+    Notes
+    -----
+    When any command has subcommands or values (or nested is True), every command and subcommand gets its
+    own function. Each function dispatches with a case statement on the words after its position,
+    and only offers its own arguments and subcommands, so completing stays fast however large the
+    CLI is. Otherwise the original flat format (every argument offered at the first position) is
+    generated.
+
+    Only the autocomplete file is written to stream, use generate_bash_value_files() to write the
+    files for value sets with more than 256 values (generate_bash_autocomplete() does this for you).
+
+    Each fragment is a separate call to stream.write(), so unbuffered streams should be wrapped in a buffer (i.e. io.BufferedWriter)
+
+    Examples
+    --------
+    Writing a bash autocomplete file for a command called 'command' to the current directory
+
+    ```
+    from sdu.autocomplete import write_bash_autocomplete, command
+
+    root = 'command' # Replace this with the name of your root command (what you type in terminal to use cli)
+
+    commands =  [ # Used for autocompletion generation
+        command("docs", ["-a", "--api", "-o", "--offline"]),
+        command("register", [])
+    ]
+
+    with open(f"{root}.sh", "w") as autocomplete_file:
+        write_bash_autocomplete(root, commands, autocomplete_file)
+    ```
+    """
+    if not type(commands) == list:
+        raise ValueError("Expected list of commands, got string instead")
+
+    if nested or any(command.subcommands or command.values for command in commands):
+        values_dir = os.path.join(os.path.abspath(output_dir), f"{root}.d", "values")
+        stream.write(_generate_values_autocomplete(root, commands))
+        for fragment in _iter_nested_autocomplete(f"_{root}", "1", ["-h", "--help", "-v", "--version"], commands, None, values_dir):
+            stream.write(fragment)
+        stream.write(f"\ncomplete -o bashdefault -o default -o filenames -F _{root} {root}\n")
+        logging.info(f"Wrote nested bash autocompletion for {len(commands)} commands")
+        return
+
+    sub_commands = [root] # list of just top level sub-commands
+    sub_commands.extend(command.name for command in commands) # Iterate through and pull just subcommands from commands list
+
+    arguments = ["-h", "--help", "-v", "--version"]
+    arguments.extend(argument for command in commands for argument in command.arguments)
+
+    for fragment in _iter_root_autocomplete(root, sub_commands, arguments):
+        stream.write(fragment)
+
+    for command in commands:
+        stream.write(_generate_command_autocomplete(root, command.name, command.arguments))
+
+    stream.write(f"\ncomplete -o bashdefault -o default -o filenames -F _{root} {root}\n")
+    logging.info(f"Wrote bash autocompletion for {len(commands)} commands")
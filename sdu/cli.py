@@ -3,6 +3,7 @@
 - Clearing the terminal
 - Centering text
 - Choosing a directory (from gui and CLI)
+- Removing, copying and syncing large directories quickly
 
 Functions
 ---------
@@ -15,13 +16,14 @@ select_directory -> str:
 center_text -> str:
     Takes a string and returns the centered result as a string
 
-Aliases
--------
-All the functions below are aliases to existing functions to
-make usage simpler
-
 remove_directory:
-    an alias for shutil.rmtree which deletes directories
+    Deletes a directory tree, unlinking files in parallel. A drop-in replacement for shutil.rmtree
+
+copy_directory -> str:
+    Copies a directory tree, copying files in parallel. A replacement for shutil.copytree
+
+sync_directory -> int:
+    Copies only the files of a directory tree that are missing or changed in the destination
 
 Examples
 --------
@@ -64,15 +66,48 @@ from sdu.cli import remove_directory
 
 remove_directory("/path/to/delete")
 ```
+
+### Keeping a backup of a project up to date
+
+```
+from sdu.cli import sync_directory
+
+sync_directory("/path/to/project", "/path/to/backup") # Only copies files that changed since the last sync
+```
+
+### Removing a large build directory with progress updates
+
+```
+from sdu.cli import remove_directory
+
+remove_directory("/path/to/build", workers=16, progress=lambda removed: print(f"Removed {removed} entries", end="\\r"))
+```
 """
 
 # Standard lib dependencies
-import os  # Used to validate and grab paths
-from shutil import rmtree as remove_directory
+import os                                        # Used to validate and grab paths
+import sys                                       # Used to pass exception info to error handlers
+import stat                                      # Used to check the type of the directory being removed
+import errno                                     # Used to create errors matching shutil.rmtree's
+import shutil                                    # Used to remove directories without dir_fd support & copy metadata
+from collections import deque                    # Used to bound how many directories are being emptied at once
+from concurrent.futures import ThreadPoolExecutor # Used to unlink & copy files in parallel
+from typing import Callable, Optional            # Used to type hint the error and progress callbacks
 
 # External Dependencies
 import colored  # Used to colour stdout output for emphasis
 
+# The errors os.copy_file_range() and os.sendfile() raise when they can't copy between two files
+_KERNEL_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSOCK}
+
+# Whether the platform can remove directories with dir_fd relative calls (the same check shutil.rmtree uses)
+_USE_FD_FUNCTIONS = (
+    hasattr(os, "fwalk")
+    and {os.open, os.stat, os.unlink, os.rmdir} <= os.supports_dir_fd
+    and os.scandir in os.supports_fd
+    and os.stat in os.supports_follow_symlinks
+)
+
 def clear_terminal() -> None:
     """Clears the current terminal.
     
@@ -236,6 +271,474 @@ def center_text(message:str) -> str:
     columns = shutil.get_terminal_size().columns
     return(message.center(columns))
 
+def remove_directory(path:str, ignore_errors:bool = False, onerror:Optional[Callable] = None, workers:Optional[int] = None, progress:Optional[Callable] = None, *, onexc:Optional[Callable] = None, dir_fd:Optional[int] = None) -> None:
+    """Deletes a directory tree, unlinking files in parallel. A drop-in replacement for shutil.rmtree
+
+    The tree is walked with os.fwalk(), and the files of each directory are unlinked relative to a
+    file descriptor of that directory on a thread pool. The emptied directories are then removed
+    bottom up. Like shutil.rmtree, working through file descriptors means a directory being swapped
+    for a symlink part way through can't redirect the deletion outside of the tree.
+
+    Parameters
+    ----------
+    path : (str)
+        The directory to delete, it can't be a symlink
+
+    ignore_errors : (bool)
+        Whether to ignore errors, see shutil.rmtree
+
+    onerror : (Callable or None)
+        Called as onerror(function, path, exc_info) for each error when errors aren't ignored, see shutil.rmtree. Errors are raised when None
+
+    workers : (int or None)
+        The number of threads to unlink files with, None for the ThreadPoolExecutor default
+
+    progress : (Callable or None)
+        Called with the total number of entries removed so far, as each directory is emptied or removed
+
+    onexc : (Callable or None)
+        Called as onexc(function, path, exception) for each error when errors aren't ignored, takes precedence over onerror; see shutil.rmtree (python 3.12+)
+
+    dir_fd : (int or None)
+        A file descriptor of the directory path is relative to, see shutil.rmtree (python 3.11+)
+
+    Notes
+    -----
+    - On platforms without dir_fd support (i.e. windows) this falls back to shutil.rmtree, without progress updates (and dir_fd is only supported there from python 3.11)
+    - Entries already deleted by something else while the tree is being removed aren't treated as errors
+    - onerror and progress are always called from the calling thread
+
+    Examples
+    --------
+    Removing a large build directory with progress updates
+
+    ```
+    from sdu.cli import remove_directory
+
+    remove_directory("/path/to/build", workers=16, progress=lambda removed: print(f"Removed {removed} entries", end="\\r"))
+    ```
+
+    Raises
+    ------
+    OSError:
+        If the directory (or something in it) can't be removed, when ignore_errors is False and onerror is None
+    """
+    def handle_error(function:Callable, failed_path:str, exc_info:tuple):
+        if ignore_errors:
+            return
+        if onexc is not None:
+            onexc(function, failed_path, exc_info[1])
+        elif onerror is not None:
+            onerror(function, failed_path, exc_info)
+        else:
+            raise exc_info[1]
+
+    if not _USE_FD_FUNCTIONS:
+        keywords = {} if dir_fd is None else {"dir_fd": dir_fd}
+        if onexc is not None or onerror is not None:
+            if sys.version_info >= (3, 12): # Passing onerror is deprecated from python 3.12
+                keywords["onexc"] = lambda function, failed_path, error: handle_error(function, failed_path, (type(error), error, error.__traceback__))
+            else:
+                keywords["onerror"] = handle_error
+        return shutil.rmtree(path, ignore_errors, **keywords)
+
+    path = os.fspath(path)
+    try:
+        original_stat = os.lstat(path, dir_fd=dir_fd)
+    except OSError:
+        handle_error(os.lstat, path, sys.exc_info())
+        return
+    try:
+        if stat.S_ISLNK(original_stat.st_mode):
+            raise OSError("Cannot call rmtree on a symbolic link") # Same error as shutil.rmtree
+        if not stat.S_ISDIR(original_stat.st_mode):
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+    except OSError:
+        handle_error(os.path.islink if stat.S_ISLNK(original_stat.st_mode) else os.rmdir, path, sys.exc_info())
+        return
+
+    def walk_error(error:OSError):
+        handle_error(os.scandir, error.filename, (type(error), error, error.__traceback__))
+
+    removed = 0
+    def finish(future) -> None:
+        nonlocal removed
+        unlinked, errors = future.result()
+        for error in errors:
+            handle_error(*error)
+        removed += unlinked
+        if progress is not None:
+            progress(removed)
+
+    # Unlink every file, one directory per task. fwalk() closes each directory's descriptor as it moves on, so tasks get their own copy
+    window = (workers or min(32, (os.cpu_count() or 1) + 4)) * 2 # Bounds how many duplicated descriptors are open at once
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        try:
+            for directory, _, filenames, directory_fd in os.fwalk(path, onerror=walk_error, follow_symlinks=False, dir_fd=dir_fd):
+                if not filenames:
+                    continue
+                task_fd = os.dup(directory_fd)
+                in_flight.append((executor.submit(_unlink_files, task_fd, directory, filenames), task_fd))
+                if len(in_flight) >= window:
+                    finish(in_flight.popleft()[0])
+            while in_flight:
+                finish(in_flight.popleft()[0])
+        except BaseException:
+            for future, task_fd in in_flight:
+                if future.cancel(): # Tasks that never ran can't close their descriptor
+                    os.close(task_fd)
+            raise
+
+    # Remove the (now file-less) directories bottom up, errors listing them were already reported above
+    for directory, dirnames, _, directory_fd in os.fwalk(path, topdown=False, follow_symlinks=False, dir_fd=dir_fd):
+        for name in dirnames:
+            try:
+                try:
+                    os.rmdir(name, dir_fd=directory_fd)
+                except NotADirectoryError: # A symlink to a directory, which is unlinked instead of followed
+                    os.unlink(name, dir_fd=directory_fd)
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError:
+                handle_error(os.rmdir, os.path.join(directory, name), sys.exc_info())
+        if dirnames and progress is not None:
+            progress(removed)
+    try:
+        os.rmdir(path, dir_fd=dir_fd)
+        removed += 1
+    except OSError:
+        handle_error(os.rmdir, path, sys.exc_info())
+        return
+    if progress is not None:
+        progress(removed)
+
+
+def _unlink_files(directory_fd:int, directory:str, filenames:list) -> tuple:
+    """Unlinks files relative to a directory's file descriptor, for remove_directory()
+
+    Parameters
+    ----------
+    directory_fd : (int)
+        A file descriptor for the directory, closed once the files are unlinked
+
+    directory : (str)
+        The path to the directory, used for error messages
+
+    filenames : (list[str])
+        The names of the files (and symlinks) to unlink
+
+    Returns
+    -------
+    tuple[int, list[tuple]]:
+        How many files were unlinked, and the (function, path, exc_info) of each file that couldn't be
+    """
+    unlinked = 0
+    errors = []
+    try:
+        for name in filenames:
+            try:
+                os.unlink(name, dir_fd=directory_fd)
+                unlinked += 1
+            except FileNotFoundError:
+                continue
+            except OSError:
+                errors.append((os.unlink, os.path.join(directory, name), sys.exc_info()))
+    finally:
+        os.close(directory_fd)
+    return unlinked, errors
+
+def copy_directory(source:str, destination:str, workers:Optional[int] = None, symlinks:bool = False, ignore:Optional[Callable] = None, dirs_exist_ok:bool = False, progress:Optional[Callable] = None) -> str:
+    """Copies a directory tree, copying files in parallel. A replacement for shutil.copytree
+
+    Directories are created as the source is walked, and files are copied on a thread pool using
+    os.copy_file_range() or os.sendfile() where available, so file contents are copied by the kernel
+    without passing through python. File and directory metadata is copied with shutil.copystat().
+
+    Parameters
+    ----------
+    source : (str)
+        The directory to copy
+
+    destination : (str)
+        Where to copy the directory to
+
+    workers : (int or None)
+        The number of threads to copy files with, None for the ThreadPoolExecutor default
+
+    symlinks : (bool)
+        Whether to copy symlinks as symlinks, or copy what they point to. See shutil.copytree
+
+    ignore : (Callable or None)
+        Called as ignore(directory, names) to get the names in each directory to skip, i.e. shutil.ignore_patterns()
+
+    dirs_exist_ok : (bool)
+        Whether to copy into the destination when it already exists, see shutil.copytree
+
+    progress : (Callable or None)
+        Called with the total number of files copied so far, as each file is copied
+
+    Examples
+    --------
+    Copying a large project, without its dependencies
+
+    ```
+    import shutil
+    from sdu.cli import copy_directory
+
+    copy_directory("/path/to/project", "/path/to/backup", workers=16, ignore=shutil.ignore_patterns("node_modules", "*.pyc"))
+    ```
+
+    Raises
+    ------
+    FileNotFoundError:
+        If the source doesn't exist, checked before the destination is created
+
+    NotADirectoryError:
+        If the source isn't a directory
+
+    FileExistsError:
+        If the destination exists and dirs_exist_ok is False
+
+    shutil.Error:
+        With a list of (source, destination, reason) for every entry that couldn't be copied, once the rest have been
+
+    Returns
+    -------
+    str:
+        The destination directory
+    """
+    os.scandir(source).close() # Raises for a missing source before anything is created, same as shutil.copytree
+    os.makedirs(destination, exist_ok=dirs_exist_ok)
+    _copy_tree(source, destination, workers, symlinks, ignore, False, progress)
+    return destination
+
+
+def sync_directory(source:str, destination:str, workers:Optional[int] = None, symlinks:bool = False, ignore:Optional[Callable] = None, progress:Optional[Callable] = None) -> int:
+    """Copies only the files of a directory tree that are missing or changed in the destination
+
+    A file is considered unchanged (and skipped) when the destination has a file with the same size
+    and modification time (to the second), the same check rsync makes by default. Otherwise it works
+    the same as copy_directory().
+
+    Parameters
+    ----------
+    source : (str)
+        The directory to copy
+
+    destination : (str)
+        The directory to bring up to date, created if it doesn't exist
+
+    workers, symlinks, ignore, progress :
+        See copy_directory()
+
+    Notes
+    -----
+    - Entries in the destination that aren't in the source are left in place
+
+    Examples
+    --------
+    Keeping a backup of a project up to date
+
+    ```
+    from sdu.cli import sync_directory
+
+    copied = sync_directory("/path/to/project", "/path/to/backup")
+    print(f"{copied} files changed since the last sync")
+    ```
+
+    Raises
+    ------
+    FileNotFoundError:
+        If the source doesn't exist, checked before the destination is created
+
+    NotADirectoryError:
+        If the source isn't a directory
+
+    shutil.Error:
+        With a list of (source, destination, reason) for every entry that couldn't be copied, once the rest have been
+
+    Returns
+    -------
+    int:
+        How many files were copied
+    """
+    os.scandir(source).close() # Raises for a missing source before anything is created
+    os.makedirs(destination, exist_ok=True)
+    return _copy_tree(source, destination, workers, symlinks, ignore, True, progress)
+
+
+def _copy_tree(source:str, destination:str, workers:Optional[int], symlinks:bool, ignore:Optional[Callable], skip_unchanged:bool, progress:Optional[Callable]) -> int:
+    """Copies the contents of source into the (existing) destination directory, see copy_directory() and sync_directory()
+
+    Returns
+    -------
+    int:
+        How many files were copied
+    """
+    source = os.fspath(source)
+    destination = os.fspath(destination)
+    errors = []
+    directories = [(source, destination)]
+    copied = 0
+
+    def finish(future, source_path:str, destination_path:str):
+        nonlocal copied
+        try:
+            if not future.result():
+                return
+        except OSError as error:
+            errors.append((source_path, destination_path, str(error)))
+            return
+        copied += 1
+        if progress is not None:
+            progress(copied)
+
+    window = (workers or min(32, (os.cpu_count() or 1) + 4)) * 2 # Bounds how many copies are queued at once
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for directory, dirnames, filenames in os.walk(source, followlinks=not symlinks, onerror=lambda error: errors.append((error.filename, "", str(error)))):
+            relative_directory = os.path.relpath(directory, source)
+            destination_directory = destination if relative_directory == os.curdir else os.path.join(destination, relative_directory)
+            if ignore is not None:
+                ignored = ignore(directory, dirnames + filenames)
+                dirnames[:] = [name for name in dirnames if name not in ignored] # Stops os.walk() descending into ignored directories
+                filenames = [name for name in filenames if name not in ignored]
+
+            for name in list(dirnames):
+                source_path = os.path.join(directory, name)
+                destination_path = os.path.join(destination_directory, name)
+                try:
+                    if symlinks and os.path.islink(source_path):
+                        _copy_symlink(source_path, destination_path)
+                        dirnames.remove(name)
+                        continue
+                    os.makedirs(destination_path, exist_ok=True)
+                except OSError as error:
+                    errors.append((source_path, destination_path, str(error)))
+                    dirnames.remove(name)
+                    continue
+                directories.append((source_path, destination_path))
+
+            for name in filenames:
+                source_path = os.path.join(directory, name)
+                destination_path = os.path.join(destination_directory, name)
+                if symlinks and os.path.islink(source_path):
+                    try:
+                        _copy_symlink(source_path, destination_path)
+                    except OSError as error:
+                        errors.append((source_path, destination_path, str(error)))
+                    continue
+                in_flight.append((executor.submit(_copy_file, source_path, destination_path, skip_unchanged), source_path, destination_path))
+                if len(in_flight) >= window:
+                    finish(*in_flight.popleft())
+        while in_flight:
+            finish(*in_flight.popleft())
+
+    # Copied last, since adding files to a directory changes its modification time
+    for source_path, destination_path in reversed(directories):
+        try:
+            shutil.copystat(source_path, destination_path)
+        except OSError as error:
+            if getattr(error, "winerror", None) is None: # Copying access times fails on some windows filesystems, shutil.copytree ignores it too
+                errors.append((source_path, destination_path, str(error)))
+    if errors:
+        raise shutil.Error(errors)
+    return copied
+
+
+def _copy_symlink(source_path:str, destination_path:str):
+    """Recreates the symlink at source_path at destination_path, replacing anything already there that isn't a directory"""
+    link_target = os.readlink(source_path)
+    if os.path.lexists(destination_path):
+        if os.path.islink(destination_path) and os.readlink(destination_path) == link_target:
+            return
+        os.unlink(destination_path)
+    os.symlink(link_target, destination_path, target_is_directory=os.path.isdir(source_path))
+
+
+def _copy_file(source_path:str, destination_path:str, skip_unchanged:bool) -> bool:
+    """Copies a file and its metadata (same as shutil.copy2), copying the contents in the kernel where possible
+
+    Parameters
+    ----------
+    source_path : (str)
+        The file to copy
+
+    destination_path : (str)
+        Where to copy the file to
+
+    skip_unchanged : (bool)
+        Whether to skip the copy when the destination has the same size and modification time (to the second)
+
+    Raises
+    ------
+    shutil.SameFileError:
+        If the destination is the same file as the source
+
+    Returns
+    -------
+    bool:
+        Whether the file was copied
+    """
+    source_stat = os.stat(source_path)
+    try:
+        destination_stat = os.stat(destination_path)
+    except FileNotFoundError:
+        destination_stat = None
+    if destination_stat is not None:
+        # Opening the destination for writing would truncate the source (i.e. hard linked trees, or copying a tree onto itself)
+        if os.path.samestat(source_stat, destination_stat):
+            raise shutil.SameFileError(f"{source_path!r} and {destination_path!r} are the same file")
+        if skip_unchanged and destination_stat.st_size == source_stat.st_size and int(destination_stat.st_mtime) == int(source_stat.st_mtime):
+            return False
+
+    with open(source_path, "rb") as source_file, open(destination_path, "wb") as destination_file:
+        _copy_file_contents(source_file, destination_file, source_stat.st_size)
+    shutil.copystat(source_path, destination_path)
+    return True
+
+
+def _copy_file_contents(source_file, destination_file, size:int):
+    """Copies the contents of one open file to another, using os.copy_file_range() then os.sendfile() before falling back to reads & writes
+
+    Parameters
+    ----------
+    source_file : (BinaryIO)
+        The file to copy from, at position 0
+
+    destination_file : (BinaryIO)
+        The file to copy to, at position 0
+
+    size : (int)
+        The size of the source file, used to size each kernel copy
+    """
+    source_fd = source_file.fileno()
+    destination_fd = destination_file.fileno()
+    chunk_size = max(size, 2 ** 20) # Files that grow while being copied are copied until the end
+
+    for kernel_copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if kernel_copy is None:
+            continue
+        offset = 0
+        try:
+            while True:
+                if kernel_copy is os.sendfile:
+                    copied = os.sendfile(destination_fd, source_fd, offset, chunk_size)
+                else:
+                    copied = os.copy_file_range(source_fd, destination_fd, chunk_size, offset, offset)
+                if not copied:
+                    if offset == 0 and size: # Some filesystems (i.e. procfs, sysfs, FUSE) report nothing to copy instead of an error
+                        break
+                    return
+                offset += copied
+        except OSError as error:
+            # Unsupported between these files (i.e. across filesystems or older kernels), try the next way
+            if offset or error.errno not in _KERNEL_COPY_UNSUPPORTED:
+                raise
+    shutil.copyfileobj(source_file, destination_file)
+
 if __name__ == "__main__":
     save_folder = select_directory(starting_dir=f"{os.environ['USERPROFILE']}\\Desktop")
 
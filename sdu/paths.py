@@ -2,6 +2,7 @@
 
 - A pre and post processing pipeline for system paths
 - Ability to add paths to the PATH variable
+- Fast, cached lookups of the executables on PATH
 
 Functions
 ---------
@@ -14,9 +15,71 @@ postprocess_paths -> list:
 process_paths -> list:
     Takes a list or tuple of paths and normalizes and globs them. See notes for details
 
+canonicalize_path -> str:
+    Preprocesses a single path, memoizing results in a bounded LRU cache that resets when HOME or the cwd change
+
+iter_preprocess_paths -> Iterator[str]:
+    Lazily preprocesses paths one at a time, see preprocess_paths() for details
+
+iter_postprocess_paths -> Iterator[str]:
+    Lazily postprocesses paths one at a time, see postprocess_paths() for details
+
+iter_process_paths -> Iterator[str]:
+    Lazily normalizes and globs paths one at a time, see process_paths() for details
+
+sharded_process_paths -> list:
+    Normalizes and globs paths across a pool of worker processes, for very large lists of patterns
+
+tree_stats -> Iterator[DirectoryStats]:
+    Measures the size and file counts of the directories paths expand to, scanning directories on a thread pool
+
+apostprocess_paths -> list:
+    Asyncio version of postprocess_paths(), runs filesystem calls in an executor
+
+aprocess_paths -> list:
+    Asyncio version of process_paths(), runs filesystem calls in an executor
+
+aiter_postprocess_paths -> AsyncIterator[str]:
+    Async iterator version of postprocess_paths(), yielding each path's results as soon as it resolves
+
+name_filter, type_filter, mtime_filter, size_filter -> Callable:
+    Create filters for the filters parameter of the paths pipeline, evaluated during expansion
+
+which -> str:
+    Indexed version of shutil.which(), resolving commands through a shared ExecutableIndex
+
 add_to_path :
     Takes in a path to a program and adds it to the sytem PATH variable
 
+add_many_to_path -> list:
+    Takes in paths to programs and adds any that weren't already added to the sytem PATH variable in one write
+
+compact_path -> list:
+    Removes duplicate, missing and empty directories from PATH, optionally moving the most used directories first
+
+Classes
+-------
+DirectoryStats:
+    A namedtuple of the totals of a single directory (path, root, files, directories, size & disk_usage), see tree_stats()
+
+PathEntry:
+    A compact record of an expanded path, carrying the information gathered while expanding it
+
+PathStatCache:
+    An opt-in cache of directory checks and listings that can be shared across paths calls
+
+ExpansionIndex:
+    A persistent on-disk index of wildcard expansions, kept valid by checking directory mtimes
+
+PathSet:
+    A set of paths stored as a trie over their components, with fast membership and ancestor queries
+
+PathWatcher:
+    Keeps the expansion of a list of paths current, re-expanding only the paths whose directories changed
+
+ExecutableIndex:
+    An index of the executables on PATH (like bash's hash table) that rebuilds itself when PATH or its directories change
+
 Notes
 -----
 ### Preprocessing steps include
@@ -27,6 +90,7 @@ Notes
 ### Postprocessing steps include
 
 - expanding wildcards (For directories, file paths are excluded)
+- expanding recursive wildcards (```**```) with optional depth limits and excluded directories
 - processing correct path seperators
 - Regex selection expansion (For directories, file paths are excluded)
 
@@ -45,6 +109,34 @@ print(preprocess_paths(paths)) # Prints: ['~/Desktop/Development/Canadian Coding
 print(postprocess_paths(paths)) # Prints: ['C:\\Users\\Kieran\\Desktop\\Development\\Canadian Coding\\SSB', 'C:\\Users\\Kieran\\Desktop\\Development\\Canadian Coding', 'C:\\Users\\Kieran\\Desktop\\Development\\Personal', 'C:\\Users\\Kieran\\Desktop\\Development\\pystall', 'C:\\Users\\Kieran\\Desktop\\Development\\python-package-template', 'C:\\Users\\Kieran\\Desktop\\Development\\Work', 'C:\\Users\\Kieran\\Desktop\\Development\\Personal\\noter', 'C:\\Users\\Kieran\\Desktop\\sdu'] 
 ```
 
+### Streaming a large list of paths
+
+```
+from sdu.paths import iter_process_paths
+
+with open("manifest.txt") as manifest: # One path/pattern per line
+    for directory in iter_process_paths(manifest): # Directories are yielded as soon as they're expanded
+        print(directory)
+```
+
+### Finding every git repository under ~/Development without descending into dependencies
+
+```
+from sdu.paths import process_paths
+
+repositories = process_paths(['~/Development/**/.git'], max_depth=4, exclude=['node_modules', 'venv'])
+```
+
+### Finding python files modified in the last day that are under 1MB
+
+```
+import time
+from sdu.paths import postprocess_paths, name_filter, mtime_filter, size_filter
+
+filters = [name_filter(include=['*.py']), mtime_filter(newer_than=time.time() - 86400), size_filter(max_size=1024**2)]
+recent_files = postprocess_paths(['~/Development/**'], include_files=True, filters=filters)
+```
+
 ### Add a folder in the downloads folder called /micro editor/micro-1.4.1
 ```
 from sdu.paths import add_to_path, process_paths
@@ -60,12 +152,56 @@ Glob module information - https://docs.python.org/3/library/glob.html
 """
 
 # Standard lib dependencies
-import re       # Used to pattern match with RegEx
-import os       # Used to validate system paths
-import glob     # Used to glob (expand) paths
-import copy     # Used to copy objects safely so no data is lost
-import logging  # Used to log information when debugging
-from typing import Union
+import re                                     # Used to pattern match with RegEx
+import os                                     # Used to validate system paths
+import stat                                   # Used to check the type of stat results
+import json                                   # Used to serialize indexed expansions
+import time                                   # Used to expire cached results
+import asyncio                                # Used to expand paths without blocking an event loop
+import fnmatch                                # Used to translate glob patterns to RegEx
+import shutil                                 # Used to look up commands given with a directory
+import tempfile                               # Used to atomically rewrite shell rc files
+import logging                                # Used to log information when debugging
+import sqlite3                                # Used to persist indexed expansions
+import functools                              # Used to bind options to worker functions & memoize preprocessing
+import itertools                              # Used to limit how many paths are read at once
+import threading                              # Used to cap concurrency per mount point
+from collections import deque                 # Used to keep parallel results in input order
+from collections import namedtuple            # Used to bundle expansion options
+from collections import OrderedDict           # Used to evict least recently used cached results
+from concurrent.futures import Executor       # Used to type executors filesystem calls run in
+from concurrent.futures import ThreadPoolExecutor # Used to expand paths in parallel
+from concurrent.futures import ProcessPoolExecutor # Used to shard expansion across processes
+from concurrent.futures import wait, FIRST_COMPLETED # Used to stream directory totals as they're scanned
+from typing import Union, Iterable, Iterator, Optional, Pattern, AsyncIterator, Callable
+
+# Matches the %USERPROFILE% portion (drive letter and username) of preprocessed windows paths
+_USERPROFILE_REGEX = re.compile(r"[A-Z]:/Users/[^/]*", re.IGNORECASE)
+
+# Matches the characters that make a path component a glob pattern
+_GLOB_MAGIC_REGEX = re.compile(r"[*?[]")
+
+# The maximum number of preprocessed paths kept by canonicalize_path()
+_CANONICAL_CACHE_SIZE = 4096
+
+# The (HOME, USERPROFILE, cwd) values the canonicalization cache was filled under, see _canonical_home()
+_canonical_snapshot = None
+_canonical_lock = threading.Lock()
+
+# Matches an export of PATH in a shell rc file, group 2 being the exported value
+_PATH_EXPORT_REGEX = re.compile(r"""^\s*export\s+PATH=(["']?)(.*)\1\s*$""")
+
+# Matches the exports of a single directory written by add_to_path(), group 1 being the directory
+_ADD_TO_PATH_EXPORT_REGEX = re.compile(r'^export PATH="([^":]+):\$PATH"\s*$')
+
+# The ExecutableIndex used by which(), created on first use
+_executable_index = None
+
+# The totals of a single directory (not including subdirectories' contents) yielded by tree_stats()
+DirectoryStats = namedtuple("DirectoryStats", ["path", "root", "files", "directories", "size", "disk_usage"])
+
+# The options used when expanding paths, see _expansion_options()
+_ExpansionOptions = namedtuple("_ExpansionOptions", ["include_files", "silent", "max_depth", "exclude", "follow_symlinks", "cache", "index", "dependencies", "filters", "entries"])
 
 
 def preprocess_paths(paths:Union[list, tuple]) -> list:
@@ -101,45 +237,21 @@ def preprocess_paths(paths:Union[list, tuple]) -> list:
     list:
         The normalized & preprocessed paths
     """
-    logging.info(f"Beginning path preprocessing on {paths}")
-    result = list(copy.deepcopy(paths))
-
-    for index, directory in enumerate(result):
-        directory = directory.strip()
-        logging.debug(f"Directory: {directory}")
-        # Convert relative directories to absolute directories
-        if directory.startswith(".") and (len(directory) > 1):
-            directory = os.path.abspath(directory)
-        # Replace HOME values
-        if not directory.startswith("~"):
-            if not os.name == "nt": # Not windows
-                directory = directory.replace(os.getenv('HOME'),"~")
-
-        # Replace backslashes (windows) with slashes (*nix)
-        directory = directory.replace("\\", "/")
-
-        # Replace old path with preprocessed form
-        result[index] = directory
-
-    # Remove the %USERPROFILE% from windows paths
-    regex = r"([A-Z]:/Users/.*)"
-    matches = re.finditer(regex, "\n".join(result), re.MULTILINE | re.IGNORECASE)
-    matches = [match.group() for match in matches]
-    for path in matches:
-        path_index = result.index(path)
-        path = path.split("/")[2::] # Remove drive letter and username
-        path[0] = "~"
-        result[path_index] = "/".join(path)
-
-    logging.debug(f"Result: {result}")
+    logging.info(f"Beginning path preprocessing on {len(paths)} paths")
+    home = _canonical_home() # Looked up once for the whole batch
+    result = [_canonicalize(directory, home) for directory in paths]
+
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"Result: {result}")
 
     return result
 
-def postprocess_paths(paths:Union[list, tuple], include_files = False, silent = True) -> list:
+def postprocess_paths(paths:Union[list, tuple], include_files = False, silent = True, workers:Optional[int] = None, mount_limits:Optional[dict] = None, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[list] = None, entries:bool = False) -> list:
     """Postprocesses existing paths (assuming they've been preprocessed) for use in environment
 
     This postprocessing means:
         - expanding wildcards
+        - expanding recursive wildcards (**), which match a directory and every directory below it
         - processing correct path seperators
         - Regex selection expansion
 
@@ -154,6 +266,40 @@ def postprocess_paths(paths:Union[list, tuple], include_files = False, silent =
     silent : (bool)
         Whether to throw an error if one of the paths is invalid
 
+    workers : (int or None)
+        When set, paths are globbed and checked on a thread pool of at most this many threads.
+        Useful on network filesystems (NFS, FUSE etc.) where every glob and stat is a round trip.
+        The result is in the same order as it would be without workers.
+
+    mount_limits : (dict[str, int] or None)
+        Only used with workers, maps mount points to the maximum number of paths under
+        that mount that can be expanded at once i.e. {'/mnt/nfs': 4}
+
+    max_depth : (int or None)
+        The maximum number of directory levels a ** wildcard descends, None for no limit
+
+    exclude : (list[str] or None)
+        Names (or glob patterns of names) to skip during expansion i.e. ['.git', 'node_modules'],
+        excluded directories are pruned without being listed
+
+    follow_symlinks : (bool)
+        Whether a ** wildcard descends into symlinked directories, symlink loops are always skipped
+
+    cache : (PathStatCache or None)
+        A cache of directory checks and listings to reuse between calls, see PathStatCache for details
+
+    index : (ExpansionIndex or None)
+        A persistent index of wildcard expansions to reuse between processes, see ExpansionIndex for details
+
+    filters : (list[Callable] or None)
+        Functions that take the os.DirEntry of each result and return whether to keep it, evaluated during
+        expansion with the information the directory listing already has. See name_filter(), type_filter(),
+        mtime_filter() and size_filter()
+
+    entries : (bool)
+        Whether to return PathEntry records instead of strings, which carry the type and stat information
+        gathered during expansion so it doesn't need to be fetched again. See PathEntry for details
+
     Example
     -------
     An example of the preprocessing to postprocessing pipeline on a windows machine (because of the wildcard and OS results will vary)
@@ -175,52 +321,20 @@ def postprocess_paths(paths:Union[list, tuple], include_files = False, silent =
     Returns
     -------
     list:
-        The list of useable paths (post-normalization & globing)
+        The list of useable paths (post-normalization & globing), as PathEntry records if entries is True
 
     See Also
     --------
     Glob module information: https://docs.python.org/3/library/glob.html
     """
-    logging.info(f"Beginning path postprocessing on {paths}")
-
-    result = []
-    for directory in paths:
-        directory = directory.strip()
-        if os.name == "nt":
-            directory = directory.replace("/", "\\")
-        if directory.startswith("."):
-            try:
-                if directory[1] == "/" or directory[1] == "\\":
-                    directory = f"{os.curdir}{directory[1::]}"
-            except IndexError:
-                directory = os.path.abspath(".")
-
-        if "~" in directory:
-            if os.name == "nt":
-                directory = directory.replace("~",f"{os.getenv('USERPROFILE')}")
-            else:
-                directory = directory.replace("~", f"{os.getenv('HOME')}")
-
-        if "*" in directory or "[" in directory:
-            wildcard_paths = glob.glob(directory.strip())
-            for wildcard_directory in wildcard_paths:
-                if include_files:
-                    result.append(wildcard_directory)
-                else:
-                    if os.path.isdir(wildcard_directory):
-                        result.append(wildcard_directory)
-
-        else: # Does not contain a tilde or glob character
-            if not silent:
-                if os.path.isdir(directory):
-                    raise NotADirectoryError(f"Directory was not found on system: {directory}")
-            if os.path.isdir(directory):
-                result.append(directory)
+    logging.info(f"Beginning path postprocessing on {len(paths)} paths")
+    result = list(iter_postprocess_paths(paths, include_files=include_files, silent=silent, workers=workers, mount_limits=mount_limits, max_depth=max_depth, exclude=exclude, follow_symlinks=follow_symlinks, cache=cache, index=index, filters=filters, entries=entries))
 
-    logging.debug(f"Result: {result}")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"Result: {result}")
     return result
 
-def process_paths(paths:Union[list, tuple]) -> list:
+def process_paths(paths:Union[list, tuple], max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[list] = None, as_pathset:bool = False) -> Union[list, "PathSet"]:
     """Takes a list or tuple of paths and normalizes and globs them. See notes for details
 
     Parameters
@@ -228,6 +342,30 @@ def process_paths(paths:Union[list, tuple]) -> list:
     paths : (list or tuple)
         A list or tuple of paths, can be relative or absolute. See Notes for details.
 
+    max_depth : (int or None)
+        The maximum number of directory levels a ** wildcard descends, None for no limit
+
+    exclude : (list[str] or None)
+        Names (or glob patterns of names) to skip during expansion i.e. ['.git', 'node_modules'],
+        excluded directories are pruned without being listed
+
+    follow_symlinks : (bool)
+        Whether a ** wildcard descends into symlinked directories, symlink loops are always skipped
+
+    cache : (PathStatCache or None)
+        A cache of directory checks and listings to reuse between calls, see PathStatCache for details
+
+    index : (ExpansionIndex or None)
+        A persistent index of wildcard expansions to reuse between processes, see ExpansionIndex for details
+
+    filters : (list[Callable] or None)
+        Functions that take the os.DirEntry of each result and return whether to keep it, evaluated during
+        expansion with the information the directory listing already has. See name_filter(), type_filter(),
+        mtime_filter() and size_filter()
+
+    as_pathset : (bool)
+        Whether to return the results as a deduplicated PathSet instead of a list, see PathSet for details
+
     Example
     -------
     An example of path processing on a windows machine (because of the wildcard and OS results will vary)
@@ -243,7 +381,7 @@ def process_paths(paths:Union[list, tuple]) -> list:
     Since this function runs the preprocess_paths() & postprocess_paths() functions all implications are carried through to this function including:
 
     - This function does not change '.' paths unless they include a relative path to a separate folder. i.e. a plain '.' is untouched but './folder-name' is converted to an absolute path.
-    - This function leaves in *'s, and brackets and globs paths using those characters for processing.
+    - This function leaves in *'s, **'s and brackets and globs paths using those characters for processing.
     - This function will take the HOME(*nix) or USERPROFILE(windows) environment variables and interpret them appropriately per OS.
 
     See Also
@@ -253,64 +391,2578 @@ def process_paths(paths:Union[list, tuple]) -> list:
 
     if not type(paths) == list and not type(paths) == tuple:
         raise ValueError("Paths must be specified as a list or tuple")
-    result = copy.deepcopy(paths)
-    result = preprocess_paths(result)
-    result = postprocess_paths(result)
+    result = preprocess_paths(paths)
+    if as_pathset: # Built as paths are expanded so the full list is never held
+        return PathSet(iter_postprocess_paths(result, max_depth=max_depth, exclude=exclude, follow_symlinks=follow_symlinks, cache=cache, index=index, filters=filters))
+    result = postprocess_paths(result, max_depth=max_depth, exclude=exclude, follow_symlinks=follow_symlinks, cache=cache, index=index, filters=filters)
     return result
 
 
-def add_to_path(program_path:str):
-    """Takes in a path to a program and adds it to the sytem PATH variable
+def canonicalize_path(path:str) -> str:
+    """Preprocesses a single path (see preprocess_paths()), memoizing the result in a bounded LRU cache
 
     Parameters
     ----------
-    program_path : str
-        The path to the installation folder of the application
+    path : (str)
+        The path to preprocess, can be relative or absolute
+
+    Example
+    -------
+    Canonicalizing the same config path repeatedly only normalizes it once
+
+    ```
+    from sdu.paths import canonicalize_path
+
+    for _ in range(1000):
+        config = canonicalize_path('C:\\Users\\Kieran\\.config\\app')
+
+    print(config) # Prints: '~/.config/app'
+    print(canonicalize_path.cache_info()) # Prints: CacheInfo(hits=999, misses=1, maxsize=4096, currsize=1)
+    ```
 
     Notes
     -----
-    * The path must be an absolute path
-    * The linux version of the command assumes you're using ~/.bashrc
-    * Because there are so many possible ways this can fail, there are no catches in place
+    - The cache holds at most 4096 paths, evicting the least recently used path when full
+    - The cache is cleared whenever HOME, USERPROFILE or the current working directory change, since relative paths and ~ substitution depend on them
+    - preprocess_paths() and iter_preprocess_paths() share this cache
+    - canonicalize_path.cache_info() and canonicalize_path.cache_clear() work the same as they do for functools.lru_cache
+
+    Returns
+    -------
+    str:
+        The normalized & preprocessed path
+    """
+    return _canonicalize(path, _canonical_home())
+
+
+def _canonical_home() -> Optional[str]:
+    """Clears the canonicalization cache if HOME, USERPROFILE or the cwd changed since it was filled
+
+    Returns
+    -------
+    str or None:
+        The value of the HOME environment variable
+    """
+    global _canonical_snapshot
+    home = os.getenv('HOME')
+    try:
+        cwd = os.getcwd()
+    except OSError: # The cwd was removed, only paths that don't depend on it can be preprocessed
+        cwd = None
+    snapshot = (home, os.getenv('USERPROFILE'), cwd)
+    if snapshot != _canonical_snapshot:
+        with _canonical_lock:
+            if snapshot != _canonical_snapshot:
+                _canonicalize.cache_clear()
+                _canonical_snapshot = snapshot
+    return home
+
+
+def _preprocess_path(directory:str, home:Optional[str]) -> str:
+    """Preprocesses a single path in one pass, see preprocess_paths() for details
+
+    Parameters
+    ----------
+    directory : (str)
+        The path to preprocess
+
+    home : (str or None)
+        The value of the HOME environment variable, looked up once by the caller for a whole batch
+
+    Returns
+    -------
+    str:
+        The normalized & preprocessed path
+    """
+    directory = directory.strip()
+    # Convert relative directories to absolute directories
+    if directory.startswith(".") and (len(directory) > 1):
+        directory = os.path.abspath(directory)
+    # Replace HOME values
+    if home and not directory.startswith("~"):
+        if not os.name == "nt": # Not windows
+            directory = directory.replace(home, "~")
+
+    # Replace backslashes (windows) with slashes (*nix)
+    directory = directory.replace("\\", "/")
+
+    # Remove the %USERPROFILE% (drive letter and username) from windows paths
+    userprofile = _USERPROFILE_REGEX.match(directory)
+    if userprofile:
+        directory = f"~{directory[userprofile.end():]}"
+
+    return directory
+
+
+# Memoized _preprocess_path(), only ever called after _canonical_home() has validated the cache
+_canonicalize = functools.lru_cache(maxsize=_CANONICAL_CACHE_SIZE)(_preprocess_path)
+
+canonicalize_path.cache_info = _canonicalize.cache_info
+canonicalize_path.cache_clear = _canonicalize.cache_clear
+
+
+def _localize_path(directory:str) -> str:
+    """Converts a preprocessed path into a path useable on the current OS (separators, relative paths and ~)
+
+    Parameters
+    ----------
+    directory : (str)
+        The path to localize, can be relative or absolute
+
+    Returns
+    -------
+    str:
+        The localized path, still including any glob characters
+    """
+    directory = directory.strip()
+    if os.name == "nt":
+        directory = directory.replace("/", "\\")
+    if directory.startswith("."):
+        try:
+            if directory[1] == "/" or directory[1] == "\\":
+                directory = f"{os.curdir}{directory[1::]}"
+        except IndexError:
+            directory = os.path.abspath(".")
+
+    if "~" in directory:
+        if os.name == "nt":
+            directory = directory.replace("~",f"{os.getenv('USERPROFILE')}")
+        else:
+            directory = directory.replace("~", f"{os.getenv('HOME')}")
+    return directory
+
+
+def _expansion_options(include_files:bool = False, silent:bool = True, max_depth:Optional[int] = None, exclude:Optional[Iterable[str]] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[Iterable[Callable]] = None, entries:bool = False) -> _ExpansionOptions:
+    """Validates and bundles the options used to expand paths, see postprocess_paths() for details
 
     Raises
     ------
     ValueError:
-        If path provided is not a valid path to a directory
+        If max_depth is negative
 
-    Examples
-    --------
-    Add a folder in the downloads folder called /micro editor/micro-1.4.1
-    ```
-    from sdu.paths import add_to_path, process_paths
+    Returns
+    -------
+    _ExpansionOptions:
+        The options, with exclude compiled to a single regex (or None)
+    """
+    if max_depth is not None and max_depth < 0:
+        raise ValueError(f"max_depth must be 0 or more, got {max_depth}")
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    if exclude:
+        exclude = re.compile("|".join(fnmatch.translate(pattern) for pattern in exclude), re.IGNORECASE if os.name == "nt" else 0)
+    else:
+        exclude = None
+    if callable(filters):
+        filters = [filters]
+    filters = tuple(filters) if filters else None
+    return _ExpansionOptions(include_files, silent, max_depth, exclude, follow_symlinks, cache, index, None, filters, entries)
+
+
+def _compile_glob_component(component:str) -> Pattern:
+    """Compiles a single glob path component (i.e. 'folder-*' or 'v[0-9]') into a regex
 
-    program_path = f"C:\\Users\\Kieran\\Downloads\\micro editor\\micro-1.4.1" # Path that contains the executeable
-    add_to_path(program_path) # Adds the program_path to the path variable
-    ```
+    Parameters
+    ----------
+    component : (str)
+        The path component to compile, supports the same syntax as the glob module (*, ? and [...])
+
+    Returns
+    -------
+    Pattern:
+        The compiled regex, case insensitive on windows
     """
-    program_path = os.path.abspath(program_path)
-    if not os.path.isdir(program_path):
-        raise ValueError(f"Path provided is not a valid path: {program_path}")
+    return re.compile(fnmatch.translate(component), re.IGNORECASE if os.name == "nt" else 0)
 
-    if os.name == "nt": # Windows systems
-        import winreg # Allows access to the windows registry
-        import ctypes # Allows interface with low-level C API's
 
-        with winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER) as root: # Get the current user registry
-            with winreg.OpenKey(root, "Environment", 0, winreg.KEY_ALL_ACCESS) as key: # Go to the environment key
-                existing_path_value = winreg.EnumValue(key, 3)[1] # Grab the current path value
-                new_path_value = existing_path_value + program_path + ";" # Takes the current path value and appends the new program path
-                winreg.SetValueEx(key, "PATH", 0, winreg.REG_EXPAND_SZ, new_path_value) # Updated the path with the updated path
+def _split_glob_pattern(pattern:str) -> tuple:
+    """Splits a localized glob pattern into the literal directory to start from and the components after it
 
-            # Tell other processes to update their environment
-            HWND_BROADCAST = 0xFFFF
-            WM_SETTINGCHANGE = 0x1A
-            SMTO_ABORTIFHUNG = 0x0002
-            result = ctypes.c_long()
-            SendMessageTimeoutW = ctypes.windll.user32.SendMessageTimeoutW
-            SendMessageTimeoutW(HWND_BROADCAST, WM_SETTINGCHANGE, 0, u"Environment", SMTO_ABORTIFHUNG, 5000, ctypes.byref(result),) 
-    else: # If system is *nix
-        with open(f"{os.getenv('HOME')}/.bashrc", "a") as bash_file:  # Open bashrc file
-            bash_file.write(f'\nexport PATH="{program_path}:$PATH"\n')  # Add program path to Path variable
-        os.system(f". {os.getenv('HOME')}/.bashrc")  # Update bash source
-    print(f"Added {program_path} to path, please restart shell for changes to take effect")
+    Parameters
+    ----------
+    pattern : (str)
+        The localized glob pattern i.e. '/home/kieran/Desktop/*/src'
+
+    Returns
+    -------
+    tuple[str, list[str]]:
+        The longest literal directory at the start of the pattern (empty for relative patterns),
+        and the remaining path components, the first of which contains a glob character
+    """
+    drive, pattern = os.path.splitdrive(pattern)
+    base = drive
+    separators = "\\/" if os.name == "nt" else "/"
+    if pattern[:1] and pattern[:1] in separators:
+        base += pattern[:1]
+    components = [component for component in re.split(f"[{re.escape(separators)}]", pattern) if component]
+
+    while components and not _GLOB_MAGIC_REGEX.search(components[0]):
+        base = os.path.join(base, components.pop(0))
+    return base, components
+
+
+def _scandir_glob(pattern:str, options:_ExpansionOptions) -> Iterator[str]:
+    """Expands a localized glob pattern using os.scandir(), yielding each match that passes options.filters as it's found
+
+    Results (and their order) are the same as glob.iglob() followed by os.path.isdir() when
+    include_files is False, but directory checks use the type information scandir already
+    read from the directory listing instead of an extra stat per match.
+
+    A ** component matches the directory it's in and every directory below it (up to
+    options.max_depth levels down), see _walk_recursive() for details.
+
+    Parameters
+    ----------
+    pattern : (str)
+        The localized glob pattern to expand, supports the same syntax as the glob module (*, ?, [...] and **)
+
+    options : (_ExpansionOptions)
+        The options to expand the pattern with
+
+    Yields
+    ------
+    str:
+        Each path that matches the pattern
+    """
+    for path, entry in _scandir_glob_entries(pattern, options):
+        result = _build_result(path, entry, options)
+        if result is not None:
+            yield result
+
+
+def _build_result(path:str, entry:Optional[os.DirEntry], options:_ExpansionOptions) -> Union[str, "PathEntry", None]:
+    """Applies options.filters to an expanded path, and builds the result for it
+
+    Parameters
+    ----------
+    path : (str)
+        The expanded path
+
+    entry : (os.DirEntry or None)
+        The directory entry the path was found through, so filters and PathEntry results can use
+        the information it already has, or None if the path was checked directly
+
+    options : (_ExpansionOptions)
+        The options the path was expanded with
+
+    Returns
+    -------
+    str, PathEntry or None:
+        The path (a PathEntry if options.entries is set), or None if it didn't pass the filters
+    """
+    if not options.filters and not options.entries:
+        return path
+    path_entry = PathEntry(path, entry)
+    if options.filters and not all(matches(path_entry) for matches in options.filters):
+        return None
+    if not options.entries:
+        return path
+    path_entry._release() # Keep what's known about the path, without holding on to the os.DirEntry
+    return path_entry
+
+
+def _scandir_glob_entries(pattern:str, options:_ExpansionOptions) -> Iterator[tuple]:
+    """Expands a localized glob pattern using os.scandir(), see _scandir_glob() for details
+
+    Parameters
+    ----------
+    pattern : (str)
+        The localized glob pattern to expand
+
+    options : (_ExpansionOptions)
+        The options to expand the pattern with
+
+    Yields
+    ------
+    tuple[str, os.DirEntry or None]:
+        Each path that matches the pattern, and the directory entry it was found through
+        (None when the path was checked directly instead of found in a listing)
+    """
+    base, components = _split_glob_pattern(pattern)
+    if components and pattern[-1:] in ("\\/" if os.name == "nt" else "/"):
+        # A trailing separator only matches directories, and is kept on the results; same as glob
+        for path, entry in _scandir_glob_components(base, components, 0, options._replace(include_files=False)):
+            yield os.path.join(path, ""), entry
+        return
+    if not components: # Nothing to expand
+        if _isdir(base, options) or (options.include_files and os.path.lexists(base)):
+            yield base, None
+        return
+    yield from _scandir_glob_components(base, components, 0, options)
+
+
+def _scandir_glob_components(base:str, components:list, index:int, options:_ExpansionOptions) -> Iterator[tuple]:
+    """Recursively matches components[index:] against the contents of base, see _scandir_glob_entries() for details
+
+    Parameters
+    ----------
+    base : (str)
+        The directory matched so far, empty for the current directory of a relative pattern
+
+    components : (list[str])
+        All the path components of the pattern after the initial literal directory
+
+    index : (int)
+        The index of the component to match against the contents of base
+
+    options : (_ExpansionOptions)
+        The options to expand the pattern with
+
+    Yields
+    ------
+    tuple[str, os.DirEntry or None]:
+        Each path that matches the pattern, and the directory entry it was found through
+    """
+    component = components[index]
+    last = index == len(components) - 1
+    _record_dependency(base, options)
+
+    if component == "**":
+        for path, is_directory, entry in _walk_recursive(base, options, include_files = last and options.include_files):
+            if last:
+                if path: # The current directory of a relative pattern is not a result; same as glob
+                    yield path, entry
+            elif is_directory:
+                yield from _scandir_glob_components(path, components, index + 1, options)
+        return
+
+    if not _GLOB_MAGIC_REGEX.search(component): # Literal components don't need a directory listing
+        path = os.path.join(base, component)
+        if not last:
+            yield from _scandir_glob_components(path, components, index + 1, options)
+        elif _isdir(path, options) or (options.include_files and os.path.lexists(path)):
+            yield path, None
+        return
+
+    matcher = _compile_glob_component(component)
+    for entry in _list_directory(base, options, include_hidden = component.startswith(".")):
+        if not matcher.match(entry.name):
+            continue
+        path = os.path.join(base, entry.name) if base else entry.name
+        if last:
+            if options.include_files or entry.is_dir():
+                yield path, entry
+        elif entry.is_dir():
+            yield from _scandir_glob_components(path, components, index + 1, options)
+
+
+def _scandir_entries(directory:str) -> list:
+    """Lists a directory with os.scandir()
+
+    Parameters
+    ----------
+    directory : (str)
+        The directory to list, empty for the current directory
+
+    Returns
+    -------
+    list[os.DirEntry]:
+        The entries, empty if the directory is missing, unreadable or not a directory (same as glob)
+    """
+    try:
+        with os.scandir(directory or os.curdir) as directory_entries:
+            # Read in full so the listing is closed before recursing, limiting open file descriptors
+            return list(directory_entries)
+    except OSError:
+        return []
+
+
+def _directory_mtime(directory:str) -> Optional[int]:
+    """Gets the modification time of a directory in nanoseconds, or None if it doesn't exist"""
+    try:
+        return os.stat(directory or os.curdir).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _record_dependency(directory:str, options:_ExpansionOptions):
+    """Records the mtime of a directory the current expansion depends on, if options.dependencies is being tracked
+
+    A directory's mtime changes whenever an entry is added to, removed from or renamed within it, so
+    an expansion is still valid as long as none of the directories it looked in have changed.
+    """
+    if options.dependencies is not None and directory not in options.dependencies:
+        options.dependencies[directory] = _directory_mtime(directory)
+
+
+def _expand_with_dependencies(directory:str, options:_ExpansionOptions) -> tuple:
+    """Fully expands a localized glob pattern, tracking the directories the result depends on
+
+    Parameters
+    ----------
+    directory : (str)
+        The localized glob pattern to expand
+
+    options : (_ExpansionOptions)
+        The options to expand the pattern with
+
+    Returns
+    -------
+    tuple[list[str], dict[str, int or None]]:
+        The expanded paths, and the mtime (in nanoseconds, None if missing) of each directory that was looked in
+    """
+    dependencies = {}
+    results = list(_scandir_glob(directory.strip(), options._replace(dependencies=dependencies)))
+    return results, dependencies
+
+
+def _isdir(path:str, options:_ExpansionOptions) -> bool:
+    """os.path.isdir(), going through options.cache when there is one"""
+    if options.cache is not None:
+        return options.cache.isdir(path)
+    return os.path.isdir(path)
+
+
+def _list_directory(directory:str, options:_ExpansionOptions, include_hidden:bool = False) -> list:
+    """Lists the entries of a directory that aren't hidden or excluded, going through options.cache when there is one
+
+    Parameters
+    ----------
+    directory : (str)
+        The directory to list, empty for the current directory
+
+    options : (_ExpansionOptions)
+        The options to expand paths with, entries matching options.exclude are skipped
+
+    include_hidden : (bool)
+        Whether to include entries starting with a .
+
+    Returns
+    -------
+    list[os.DirEntry]:
+        The entries, empty if the directory is missing, unreadable or not a directory (same as glob)
+    """
+    _record_dependency(directory, options)
+    if options.cache is not None:
+        entries = options.cache.listdir(directory)
+    else:
+        entries = _scandir_entries(directory)
+    return [
+        entry for entry in entries
+        if (include_hidden or not entry.name.startswith("."))
+        and not (options.exclude and options.exclude.match(entry.name))
+    ]
+
+
+def _directory_identity(path:str, entry:Optional[os.DirEntry] = None) -> Optional[tuple]:
+    """Gets a (device, inode) pair that uniquely identifies a directory, following symlinks
+
+    Parameters
+    ----------
+    path : (str)
+        The path to the directory, empty for the current directory
+
+    entry : (os.DirEntry or None)
+        The entry for the directory if there is one, since it caches the stat result
+
+    Returns
+    -------
+    tuple[int, int] or None:
+        The identity of the directory, or None if it can't be stat'ed
+    """
+    try:
+        stat_result = entry.stat() if entry is not None else os.stat(path or os.curdir)
+    except OSError:
+        return None
+    return (stat_result.st_dev, stat_result.st_ino)
+
+
+def _walk_recursive(base:str, options:_ExpansionOptions, include_files:bool = False) -> Iterator[tuple]:
+    """Walks every directory below base (pre-order, same order as glob) for ** expansion
+
+    The walk streams, it only holds the listings of the directories between base and
+    the current directory, never the whole tree.
+
+    - Directories deeper than options.max_depth levels below base are not descended into
+    - Entries matching options.exclude are skipped, so excluded directories are pruned before they're listed
+    - Hidden entries are skipped; same as glob
+    - Symlinked directories are only followed when options.follow_symlinks is set, and never
+        when they point back to a directory that's currently being walked (symlink loops)
+
+    Parameters
+    ----------
+    base : (str)
+        The directory to start from, empty for the current directory
+
+    options : (_ExpansionOptions)
+        The options to expand the pattern with
+
+    include_files : (bool)
+        Whether to include file results
+
+    Yields
+    ------
+    tuple[str, bool, os.DirEntry or None]:
+        Each path (starting with base itself), whether it's a directory, and its directory entry (None for base)
+    """
+    if not _isdir(base or os.curdir, options):
+        return
+    yield base, True, None
+    if options.max_depth == 0:
+        return
+
+    ancestors = (_directory_identity(base),) if options.follow_symlinks else ()
+    stack = [(iter(_list_directory(base, options)), base, ancestors, 1)]
+    while stack:
+        entries, directory, ancestors, depth = stack[-1]
+        entry = next(entries, None)
+        if entry is None: # Finished with this directory
+            stack.pop()
+            continue
+
+        path = os.path.join(directory, entry.name) if directory else entry.name
+        if not entry.is_dir():
+            if include_files:
+                yield path, False, entry
+            continue
+        yield path, True, entry
+
+        if options.max_depth is not None and depth >= options.max_depth:
+            continue
+        if options.follow_symlinks:
+            identity = _directory_identity(path, entry)
+            if identity is None or identity in ancestors: # Symlink loop
+                continue
+            child_ancestors = ancestors + (identity,)
+        elif entry.is_symlink():
+            continue
+        else:
+            child_ancestors = ancestors
+        stack.append((iter(_list_directory(path, options)), path, child_ancestors, depth + 1))
+
+
+def _expand_path(directory:str, options:_ExpansionOptions) -> Iterator[str]:
+    """Globs a single localized path, yielding each resulting path as it's found
+
+    Parameters
+    ----------
+    directory : (str)
+        The localized path (see _localize_path()) to expand
+
+    options : (_ExpansionOptions)
+        The options to expand the path with
+
+    Yields
+    ------
+    str:
+        The useable path(s) the provided path expands to
+    """
+    if "*" in directory or "[" in directory:
+        if options.index is not None: # Indexed expansions are stored as unfiltered paths
+            for path in options.index._expand(directory, options._replace(filters=None, entries=False)):
+                result = _build_result(path, None, options)
+                if result is not None:
+                    yield result
+        else:
+            yield from _scandir_glob(directory.strip(), options)
+
+    else: # Does not contain a tilde or glob character
+        if not options.silent:
+            if _isdir(directory, options):
+                raise NotADirectoryError(f"Directory was not found on system: {directory}")
+        if _isdir(directory, options):
+            result = _build_result(directory, None, options)
+            if result is not None:
+                yield result
+
+
+def _postprocess_path(directory:str, options:_ExpansionOptions) -> Iterator[str]:
+    """Postprocesses a single path, yielding each resulting path as it's found. See postprocess_paths() for details
+
+    Parameters
+    ----------
+    directory : (str)
+        The path to postprocess, can be relative or absolute
+
+    options : (_ExpansionOptions)
+        The options to expand the path with
+
+    Yields
+    ------
+    str:
+        The useable path(s) the provided path expands to
+    """
+    yield from _expand_path(_localize_path(directory), options)
+
+
+def _postprocess_path_list(directory:str, options:_ExpansionOptions) -> list:
+    """Fully postprocesses a single path into a list, for running in an executor. See postprocess_paths() for details"""
+    return list(_postprocess_path(directory, options))
+
+
+def _mount_semaphore(directory:str, mount_limits:list) -> Optional[threading.BoundedSemaphore]:
+    """Finds the concurrency limit for the most specific mount a localized path falls under
+
+    Parameters
+    ----------
+    directory : (str)
+        The localized path to find the mount of
+
+    mount_limits : (list[tuple[str, threading.BoundedSemaphore]])
+        The localized mount points and their semaphores, sorted longest mount first
+
+    Returns
+    -------
+    threading.BoundedSemaphore or None:
+        The semaphore for the mount, or None if the path is not under any of the mounts
+    """
+    directory = os.path.normcase(directory)
+    for mount, semaphore in mount_limits:
+        if directory == mount or directory.startswith(mount.rstrip(os.sep) + os.sep):
+            return semaphore
+    return None
+
+
+def _parallel_postprocess_paths(paths:Iterable[str], options:_ExpansionOptions, workers:int, mount_limits:Optional[dict]) -> Iterator[str]:
+    """Postprocesses paths on a bounded thread pool, yielding results in input order
+
+    Parameters
+    ----------
+    paths : (Iterable[str])
+        Any iterable of paths, can be relative or absolute
+
+    options : (_ExpansionOptions)
+        The options to expand the paths with
+
+    workers : (int)
+        The maximum number of paths to expand at once
+
+    mount_limits : (dict[str, int] or None)
+        Maps mount points to the maximum number of paths under them that can be expanded at once
+
+    Yields
+    ------
+    str:
+        Each useable path (post-normalization & globing), in input order
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    limits = []
+    for mount, limit in (mount_limits or {}).items():
+        limits.append((os.path.normcase(_localize_path(mount)), threading.BoundedSemaphore(limit)))
+    limits.sort(key=lambda mount_limit: len(mount_limit[0]), reverse=True)
+
+    def expand(directory:str) -> list:
+        directory = _localize_path(directory)
+        semaphore = _mount_semaphore(directory, limits)
+        if semaphore is None:
+            return list(_expand_path(directory, options))
+        with semaphore:
+            return list(_expand_path(directory, options))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque() # Futures in input order, bounded so huge iterables aren't read all at once
+        for directory in paths:
+            pending.append(executor.submit(expand, directory))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def iter_preprocess_paths(paths:Iterable[str]) -> Iterator[str]:
+    """Lazily preprocesses paths one at a time, see preprocess_paths() for details
+
+    Parameters
+    ----------
+    paths : (Iterable[str])
+        Any iterable of paths (list, tuple, generator, open file etc.), can be relative or absolute
+
+    Example
+    -------
+    Preprocessing paths from a manifest file without reading it all into memory
+
+    ```
+    from sdu.paths import iter_preprocess_paths
+
+    with open("manifest.txt") as manifest:
+        for path in iter_preprocess_paths(manifest):
+            print(path)
+    ```
+
+    Yields
+    ------
+    str:
+        Each normalized & preprocessed path, in input order
+    """
+    if isinstance(paths, str):
+        raise ValueError("Paths must be specified as an iterable of paths, not a single string")
+    home = _canonical_home()
+    for directory in paths:
+        yield _canonicalize(directory, home)
+
+
+def iter_postprocess_paths(paths:Iterable[str], include_files:bool = False, silent:bool = True, workers:Optional[int] = None, mount_limits:Optional[dict] = None, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[list] = None, entries:bool = False) -> Iterator[Union[str, "PathEntry"]]:
+    """Lazily postprocesses paths one at a time, see postprocess_paths() for details
+
+    Parameters
+    ----------
+    paths : (Iterable[str])
+        Any iterable of paths (list, tuple, generator, open file etc.), can be relative or absolute
+
+    include_files : (bool)
+        Whether to include file results
+
+    silent : (bool)
+        Whether to throw an error if one of the paths is invalid
+
+    workers : (int or None)
+        When set, paths are expanded on a thread pool of at most this many threads, see postprocess_paths() for details
+
+    mount_limits : (dict[str, int] or None)
+        Caps how many paths under each mount point are expanded at once when workers is set, see postprocess_paths() for details
+
+    max_depth : (int or None)
+        The maximum number of directory levels a ** wildcard descends, None for no limit
+
+    exclude : (list[str] or None)
+        Names (or glob patterns of names) to skip during expansion i.e. ['.git', 'node_modules'],
+        excluded directories are pruned without being listed
+
+    follow_symlinks : (bool)
+        Whether a ** wildcard descends into symlinked directories, symlink loops are always skipped
+
+    cache : (PathStatCache or None)
+        A cache of directory checks and listings to reuse between calls, see PathStatCache for details
+
+    index : (ExpansionIndex or None)
+        A persistent index of wildcard expansions to reuse between processes, see ExpansionIndex for details
+
+    filters : (list[Callable] or None)
+        Functions that take the os.DirEntry of each result and return whether to keep it, evaluated during
+        expansion with the information the directory listing already has. See name_filter(), type_filter(),
+        mtime_filter() and size_filter()
+
+    entries : (bool)
+        Whether to return PathEntry records instead of strings, which carry the type and stat information
+        gathered during expansion so it doesn't need to be fetched again. See PathEntry for details
+
+    Yields
+    ------
+    str or PathEntry:
+        Each useable path (post-normalization & globing), in input order
+    """
+    if isinstance(paths, str):
+        raise ValueError("Paths must be specified as an iterable of paths, not a single string")
+    options = _expansion_options(include_files, silent, max_depth, exclude, follow_symlinks, cache, index, filters, entries)
+    if workers:
+        yield from _parallel_postprocess_paths(paths, options, workers, mount_limits)
+        return
+    for directory in paths:
+        yield from _postprocess_path(directory, options)
+
+
+def iter_process_paths(paths:Iterable[str], include_files:bool = False, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[list] = None) -> Iterator[str]:
+    """Lazily normalizes and globs paths one at a time, see process_paths() for details
+
+    Unlike process_paths() no copies of the input are made, so memory usage stays
+    flat regardless of how many paths are provided, and results are available as
+    soon as each path has been expanded.
+
+    Parameters
+    ----------
+    paths : (Iterable[str])
+        Any iterable of paths (list, tuple, generator, open file etc.), can be relative or absolute
+
+    include_files : (bool)
+        Whether to include file results
+
+    max_depth : (int or None)
+        The maximum number of directory levels a ** wildcard descends, None for no limit
+
+    exclude : (list[str] or None)
+        Names (or glob patterns of names) to skip during expansion i.e. ['.git', 'node_modules'],
+        excluded directories are pruned without being listed
+
+    follow_symlinks : (bool)
+        Whether a ** wildcard descends into symlinked directories, symlink loops are always skipped
+
+    cache : (PathStatCache or None)
+        A cache of directory checks and listings to reuse between calls, see PathStatCache for details
+
+    index : (ExpansionIndex or None)
+        A persistent index of wildcard expansions to reuse between processes, see ExpansionIndex for details
+
+    filters : (list[Callable] or None)
+        Functions that take the os.DirEntry of each result and return whether to keep it, evaluated during
+        expansion with the information the directory listing already has. See name_filter(), type_filter(),
+        mtime_filter() and size_filter()
+
+    Example
+    -------
+    Streaming a large list of paths
+
+    ```
+    from sdu.paths import iter_process_paths
+
+    with open("manifest.txt") as manifest: # One path/pattern per line
+        for directory in iter_process_paths(manifest):
+            print(directory)
+    ```
+
+    Yields
+    ------
+    str:
+        Each useable path (post-normalization & globing), in input order
+    """
+    return iter_postprocess_paths(iter_preprocess_paths(paths), include_files=include_files, max_depth=max_depth, exclude=exclude, follow_symlinks=follow_symlinks, cache=cache, index=index, filters=filters)
+
+
+def sharded_process_paths(paths:Union[list, tuple], processes:Optional[int] = None, chunk_size:int = 256, include_files:bool = False, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True) -> list:
+    """Normalizes and globs paths across a pool of worker processes, for very large lists of patterns
+
+    The paths are split into chunks of chunk_size, and each worker process runs the full
+    preprocess_paths() & postprocess_paths() pipeline over a chunk at a time. Results are
+    merged back in input order, with duplicates removed (the first occurrence is kept).
+
+    Parameters
+    ----------
+    paths : (list or tuple)
+        A list or tuple of paths, can be relative or absolute. See process_paths() for details.
+
+    processes : (int or None)
+        The number of worker processes, None for one per CPU
+
+    chunk_size : (int)
+        How many paths are sent to a worker at once, larger chunks mean less inter-process communication
+
+    include_files : (bool)
+        Whether to include file results
+
+    max_depth, exclude, follow_symlinks :
+        See postprocess_paths()
+
+    Notes
+    -----
+    - Worker processes can't share a PathStatCache or ExpansionIndex, so neither are accepted
+    - Starting worker processes has a fixed cost, so for small lists process_paths() will be faster
+
+    Examples
+    --------
+    Expanding every pattern in a large manifest in a nightly job
+
+    ```
+    from sdu.paths import sharded_process_paths
+
+    with open("manifest.txt") as manifest:
+        patterns = manifest.read().splitlines()
+
+    directories = sharded_process_paths(patterns, chunk_size=1000)
+    ```
+
+    Returns
+    -------
+    list:
+        The deduplicated list of useable paths (post-normalization & globing), in input order
+    """
+    if not type(paths) == list and not type(paths) == tuple:
+        raise ValueError("Paths must be specified as a list or tuple")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    # Validated here so invalid options raise before any processes are started
+    _expansion_options(include_files, True, max_depth, exclude, follow_symlinks)
+
+    chunks = [paths[start:start + chunk_size] for start in range(0, len(paths), chunk_size)]
+    worker = functools.partial(_process_paths_chunk, include_files=include_files, max_depth=max_depth, exclude=exclude, follow_symlinks=follow_symlinks)
+
+    result = []
+    seen = set()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for chunk_result in executor.map(worker, chunks): # map() keeps chunks in input order
+            for path in chunk_result:
+                if path not in seen:
+                    seen.add(path)
+                    result.append(path)
+    return result
+
+
+def _process_paths_chunk(chunk:list, include_files:bool, max_depth:Optional[int], exclude:Optional[list], follow_symlinks:bool) -> list:
+    """Runs the full pipeline on a chunk of paths inside a worker process, see sharded_process_paths() for details"""
+    return list(iter_process_paths(chunk, include_files=include_files, max_depth=max_depth, exclude=exclude, follow_symlinks=follow_symlinks))
+
+
+def tree_stats(paths:Union[list, tuple], workers:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = False) -> Iterator[DirectoryStats]:
+    """Measures the size and file counts of the directories paths expand to, scanning directories on a thread pool
+
+    Every directory under the expanded roots is scanned with os.scandir() as its own task, and its
+    totals are yielded as soon as the scan completes (so in no particular order). Each file is only
+    counted once, even if it's hard linked more than once under the roots, and each directory is
+    only scanned once, even if the roots overlap. Roots inside another root are dropped, so every
+    directory is counted under its outermost root.
+
+    Parameters
+    ----------
+    paths : (list or tuple)
+        A list or tuple of paths, can be relative or absolute. See process_paths() for details.
+
+    workers : (int or None)
+        The number of threads to scan directories with, None for the ThreadPoolExecutor default
+
+    exclude : (list or None)
+        Glob patterns of entry names (i.e. 'node_modules') to skip, excluded directories aren't descended into
+
+    follow_symlinks : (bool)
+        Whether to descend into symlinked directories, symlinks are otherwise counted as files
+
+    Notes
+    -----
+    - Unlike the rest of the pipeline, hidden files and directories are counted
+    - The totals of each directory only include its own entries, sum the totals by root for the size of a whole tree
+    - Entries that can't be stat'ed, and the contents of directories that can't be read, aren't counted
+    - Windows doesn't report hard links through os.scandir(), so hard linked files are counted each time there
+
+    Examples
+    --------
+    Finding the total size of each project directory for a quota report
+
+    ```
+    from collections import Counter
+    from sdu.paths import tree_stats
+
+    sizes = Counter()
+    for stats in tree_stats(['~/Development/*'], workers=16):
+        sizes[stats.root] += stats.size
+
+    print(sizes.most_common(5)) # Prints: [('/home/kieran/Development/sdu', 104857600), ...]
+    ```
+
+    Yields
+    ------
+    DirectoryStats:
+        The totals of each directory, as each scan completes
+    """
+    if not type(paths) == list and not type(paths) == tuple:
+        raise ValueError("Paths must be specified as a list or tuple")
+    options = _expansion_options(exclude=exclude, follow_symlinks=follow_symlinks)
+    roots = process_paths(paths, exclude=exclude, follow_symlinks=follow_symlinks)
+    outermost = PathSet(roots).collapse()
+    roots = [root for root in roots if root in outermost]
+    logging.info(f"Measuring {len(roots)} directory trees")
+
+    seen = (set(), set(), threading.Lock()) # (device, inode) of the scanned directories and hard linked files
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = {executor.submit(_directory_stats, root, root, options, seen) for root in roots}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stats, subdirectories = future.result()
+                for subdirectory in subdirectories: # Queued before yielding so the pool stays busy
+                    pending.add(executor.submit(_directory_stats, subdirectory, stats.root, options, seen))
+                if stats.path is not None:
+                    yield stats
+    finally: # Stop scanning if the caller stops iterating early
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _directory_stats(directory:str, root:str, options:_ExpansionOptions, seen:tuple) -> tuple:
+    """Scans a single directory for tree_stats()
+
+    Parameters
+    ----------
+    directory : (str)
+        The directory to scan
+
+    root : (str)
+        The expanded root the directory is under
+
+    options : (_ExpansionOptions)
+        The options to scan with, entries matching options.exclude are skipped
+
+    seen : (tuple[set, set, threading.Lock])
+        The identities of the directories and hard linked files already counted, and the lock guarding them
+
+    Returns
+    -------
+    tuple[DirectoryStats, list[str]]:
+        The totals of the directory (with a path of None if it was already scanned), and its subdirectories
+    """
+    seen_directories, seen_files, lock = seen
+    identity = _directory_identity(directory)
+    with lock:
+        if identity is None or identity in seen_directories:
+            return DirectoryStats(None, root, 0, 0, 0, 0), []
+        seen_directories.add(identity)
+
+    files = directories = size = disk_usage = 0
+    subdirectories = []
+    for entry in _scandir_entries(directory):
+        if options.exclude and options.exclude.match(entry.name):
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=options.follow_symlinks):
+                directories += 1
+                subdirectories.append(entry.path)
+                continue
+            stat_result = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        if stat_result.st_nlink > 1:
+            with lock:
+                if (stat_result.st_dev, stat_result.st_ino) in seen_files:
+                    continue
+                seen_files.add((stat_result.st_dev, stat_result.st_ino))
+        files += 1
+        size += stat_result.st_size
+        blocks = getattr(stat_result, "st_blocks", None) # Not available on windows
+        disk_usage += blocks * 512 if blocks is not None else stat_result.st_size
+    return DirectoryStats(directory, root, files, directories, size, disk_usage), subdirectories
+
+
+async def apostprocess_paths(paths:Iterable[str], include_files:bool = False, silent:bool = True, concurrency:int = 8, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[list] = None, executor:Optional[Executor] = None) -> list:
+    """Asyncio version of postprocess_paths(), see postprocess_paths() for details
+
+    The globbing and stat calls for each path run in an executor so the event loop is never
+    blocked, and up to concurrency paths are expanded at once.
+
+    Parameters
+    ----------
+    paths : (Iterable[str])
+        Any iterable of paths, can be relative or absolute
+
+    include_files : (bool)
+        Whether to include file results
+
+    silent : (bool)
+        Whether to throw an error if one of the paths is invalid
+
+    concurrency : (int)
+        The maximum number of paths to expand at once
+
+    max_depth, exclude, follow_symlinks, cache, index, filters :
+        See postprocess_paths()
+
+    executor : (concurrent.futures.Executor or None)
+        The executor to run filesystem calls in, None for the event loop's default executor
+
+    Examples
+    --------
+    Expanding paths inside an asyncio service
+
+    ```
+    import asyncio
+    from sdu.paths import apostprocess_paths
+
+    async def main():
+        directories = await apostprocess_paths(['/mnt/nfs/projects/*', '/mnt/nfs/archive/*'], concurrency=4)
+
+    asyncio.run(main())
+    ```
+
+    Returns
+    -------
+    list:
+        The list of useable paths (post-normalization & globing), in input order
+    """
+    if isinstance(paths, str):
+        raise ValueError("Paths must be specified as an iterable of paths, not a single string")
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    options = _expansion_options(include_files, silent, max_depth, exclude, follow_symlinks, cache, index, filters)
+    loop = asyncio.get_event_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def expand(directory:str) -> list:
+        async with semaphore:
+            return await loop.run_in_executor(executor, _postprocess_path_list, directory, options)
+
+    results = await asyncio.gather(*(expand(directory) for directory in paths))
+    return [path for result in results for path in result]
+
+
+async def aprocess_paths(paths:Union[list, tuple], concurrency:int = 8, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[list] = None, executor:Optional[Executor] = None) -> list:
+    """Asyncio version of process_paths(), see process_paths() and apostprocess_paths() for details
+
+    Parameters
+    ----------
+    paths : (list or tuple)
+        A list or tuple of paths, can be relative or absolute
+
+    concurrency : (int)
+        The maximum number of paths to expand at once
+
+    max_depth, exclude, follow_symlinks, cache, index, filters :
+        See postprocess_paths()
+
+    executor : (concurrent.futures.Executor or None)
+        The executor to run filesystem calls in, None for the event loop's default executor
+
+    Returns
+    -------
+    list:
+        The list of useable paths (post-normalization & globing), in input order
+    """
+    if not type(paths) == list and not type(paths) == tuple:
+        raise ValueError("Paths must be specified as a list or tuple")
+    return await apostprocess_paths(preprocess_paths(paths), concurrency=concurrency, max_depth=max_depth, exclude=exclude, follow_symlinks=follow_symlinks, cache=cache, index=index, filters=filters, executor=executor)
+
+
+async def aiter_postprocess_paths(paths:Iterable[str], include_files:bool = False, silent:bool = True, concurrency:int = 8, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True, cache:Optional["PathStatCache"] = None, index:Optional["ExpansionIndex"] = None, filters:Optional[list] = None, executor:Optional[Executor] = None) -> AsyncIterator[str]:
+    """Async iterator version of postprocess_paths(), yielding each path's results as soon as it resolves
+
+    Unlike apostprocess_paths() results are yielded in the order paths finish expanding (not input order),
+    and paths are only read from the input as earlier ones finish, so at most concurrency are pending at once.
+
+    Parameters
+    ----------
+    paths : (Iterable[str])
+        Any iterable of paths, can be relative or absolute
+
+    include_files : (bool)
+        Whether to include file results
+
+    silent : (bool)
+        Whether to throw an error if one of the paths is invalid
+
+    concurrency : (int)
+        The maximum number of paths to expand at once
+
+    max_depth, exclude, follow_symlinks, cache, index, filters :
+        See postprocess_paths()
+
+    executor : (concurrent.futures.Executor or None)
+        The executor to run filesystem calls in, None for the event loop's default executor
+
+    Examples
+    --------
+    Starting work on directories as soon as they're found
+
+    ```
+    import asyncio
+    from sdu.paths import aiter_postprocess_paths
+
+    async def main():
+        async for directory in aiter_postprocess_paths(['/mnt/nfs/projects/*', '/mnt/nfs/archive/*']):
+            print(directory)
+
+    asyncio.run(main())
+    ```
+
+    Yields
+    ------
+    str:
+        Each useable path (post-normalization & globing)
+    """
+    if isinstance(paths, str):
+        raise ValueError("Paths must be specified as an iterable of paths, not a single string")
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    options = _expansion_options(include_files, silent, max_depth, exclude, follow_symlinks, cache, index, filters)
+    loop = asyncio.get_event_loop()
+    remaining = iter(paths)
+    pending = set()
+
+    try:
+        while True:
+            for directory in itertools.islice(remaining, concurrency - len(pending)):
+                pending.add(loop.run_in_executor(executor, _postprocess_path_list, directory, options))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                for path in future.result():
+                    yield path
+    finally:
+        for future in pending: # Consumer stopped early or an expansion failed
+            future.cancel()
+
+
+def name_filter(include:Optional[Iterable[str]] = None, exclude:Optional[Iterable[str]] = None) -> Callable:
+    """Creates a filter (for the filters parameter of postprocess_paths()) that matches entry names against glob patterns
+
+    Parameters
+    ----------
+    include : (list[str] or None)
+        Patterns names must match at least one of i.e. ['*.py', '*.md'], None to allow any name
+
+    exclude : (list[str] or None)
+        Patterns names must not match any of i.e. ['*.pyc'], None to not exclude any name
+
+    Returns
+    -------
+    Callable[[os.DirEntry], bool]:
+        The filter
+    """
+    def compile_patterns(patterns):
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns), re.IGNORECASE if os.name == "nt" else 0)
+
+    include_regex = compile_patterns(include) if include else None
+    exclude_regex = compile_patterns(exclude) if exclude else None
+
+    def matches_name(entry) -> bool:
+        if include_regex and not include_regex.match(entry.name):
+            return False
+        return not (exclude_regex and exclude_regex.match(entry.name))
+    return matches_name
+
+
+def type_filter(*types:str) -> Callable:
+    """Creates a filter (for the filters parameter of postprocess_paths()) that matches entry types
+
+    Uses the type information from the directory listing, so no extra stat is needed on most systems.
+
+    Parameters
+    ----------
+    types : (str)
+        The types to allow, any of 'file', 'dir' or 'symlink'
+
+    Raises
+    ------
+    ValueError:
+        If one of the types is not 'file', 'dir' or 'symlink'
+
+    Returns
+    -------
+    Callable[[os.DirEntry], bool]:
+        The filter
+    """
+    checks = {"file": lambda entry: entry.is_file(), "dir": lambda entry: entry.is_dir(), "symlink": lambda entry: entry.is_symlink()}
+    for entry_type in types:
+        if entry_type not in checks:
+            raise ValueError(f"Type must be one of 'file', 'dir' or 'symlink', got {entry_type!r}")
+    selected_checks = [checks[entry_type] for entry_type in types]
+
+    def matches_type(entry) -> bool:
+        return any(check(entry) for check in selected_checks)
+    return matches_type
+
+
+def mtime_filter(newer_than:Optional[float] = None, older_than:Optional[float] = None) -> Callable:
+    """Creates a filter (for the filters parameter of postprocess_paths()) that matches entry modification times
+
+    Parameters
+    ----------
+    newer_than : (float or None)
+        Entries must have been modified after this time (seconds since the epoch i.e. time.time() - 86400)
+
+    older_than : (float or None)
+        Entries must have been modified before this time (seconds since the epoch)
+
+    Returns
+    -------
+    Callable[[os.DirEntry], bool]:
+        The filter
+    """
+    def matches_mtime(entry) -> bool:
+        try:
+            modified = entry.stat().st_mtime
+        except OSError:
+            return False
+        if newer_than is not None and modified <= newer_than:
+            return False
+        return older_than is None or modified < older_than
+    return matches_mtime
+
+
+def size_filter(min_size:Optional[int] = None, max_size:Optional[int] = None) -> Callable:
+    """Creates a filter (for the filters parameter of postprocess_paths()) that matches entry sizes
+
+    Parameters
+    ----------
+    min_size : (int or None)
+        The minimum size in bytes (inclusive)
+
+    max_size : (int or None)
+        The maximum size in bytes (inclusive)
+
+    Returns
+    -------
+    Callable[[os.DirEntry], bool]:
+        The filter
+    """
+    def matches_size(entry) -> bool:
+        try:
+            size = entry.stat().st_size
+        except OSError:
+            return False
+        if min_size is not None and size < min_size:
+            return False
+        return max_size is None or size <= max_size
+    return matches_size
+
+
+class PathEntry:
+    """A compact record of an expanded path, returned by postprocess_paths(entries=True)
+
+    Carries the type information (and stat result, if one was needed for filters) that was gathered
+    while the path was expanded, so callers don't need another syscall per path to get it. Anything
+    that wasn't gathered is computed lazily on first access and then cached. Instances use __slots__
+    so millions of them take far less memory than dicts, and they're compatible with os.DirEntry
+    (name, path, is_dir(), is_file(), is_symlink(), stat() and os.fspath()).
+
+    Attributes
+    ----------
+    path : (str)
+        The expanded path
+
+    Examples
+    --------
+    Summing the size of every file under a directory without stat'ing them a second time
+
+    ```
+    from sdu.paths import postprocess_paths
+
+    entries = postprocess_paths(['~/Documents/**'], include_files=True, entries=True)
+    print(sum(entry.size for entry in entries if entry.is_file()))
+    ```
+    """
+    __slots__ = ("path", "_flags", "_stat", "_entry")
+
+    # Bits of _flags
+    _TYPE_KNOWN = 1
+    _DIRECTORY = 2
+    _FILE = 4
+    _SYMLINK = 8
+
+    def __init__(self, path:str, entry:Optional[os.DirEntry] = None):
+        self.path = path
+        self._flags = 0
+        self._stat = None
+        self._entry = entry # Only held during expansion, see _release()
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __str__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return f"PathEntry({self.path!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PathEntry):
+            return self.path == other.path
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def _release(self):
+        """Copies what the os.DirEntry already knows about the path and drops the reference to it"""
+        if self._entry is not None:
+            self._load_type()
+            self._entry = None
+
+    def _load_type(self):
+        """Fills in the type flags, from the os.DirEntry (usually without a syscall) or a stat"""
+        flags = self._TYPE_KNOWN
+        if self._entry is not None:
+            try:
+                if self._entry.is_dir():
+                    flags |= self._DIRECTORY
+                elif self._entry.is_file():
+                    flags |= self._FILE
+                if self._entry.is_symlink():
+                    flags |= self._SYMLINK
+            except OSError:
+                pass
+        else:
+            try:
+                link_stat = os.lstat(self.path)
+                if stat.S_ISLNK(link_stat.st_mode):
+                    flags |= self._SYMLINK
+                    mode = self.stat().st_mode
+                else:
+                    mode = link_stat.st_mode
+                    self._stat = link_stat # Not a symlink, so lstat and stat are the same
+                if stat.S_ISDIR(mode):
+                    flags |= self._DIRECTORY
+                elif stat.S_ISREG(mode):
+                    flags |= self._FILE
+            except OSError:
+                pass
+        self._flags = flags
+
+    def _has_flag(self, flag:int) -> bool:
+        if not self._flags & self._TYPE_KNOWN:
+            self._load_type()
+        return bool(self._flags & flag)
+
+    @property
+    def name(self) -> str:
+        """The final component of the path"""
+        return os.path.basename(self.path.rstrip("\\/"))
+
+    def is_dir(self, follow_symlinks:bool = True) -> bool:
+        """Whether the path is a directory (or a symlink to one when follow_symlinks is True)"""
+        return self._has_flag(self._DIRECTORY) and (follow_symlinks or not self._has_flag(self._SYMLINK))
+
+    def is_file(self, follow_symlinks:bool = True) -> bool:
+        """Whether the path is a regular file (or a symlink to one when follow_symlinks is True)"""
+        return self._has_flag(self._FILE) and (follow_symlinks or not self._has_flag(self._SYMLINK))
+
+    def is_symlink(self) -> bool:
+        """Whether the path is a symlink"""
+        return self._has_flag(self._SYMLINK)
+
+    def stat(self, follow_symlinks:bool = True) -> os.stat_result:
+        """The stat result of the path, cached after the first call
+
+        Parameters
+        ----------
+        follow_symlinks : (bool)
+            Whether to stat the target of a symlink instead of the symlink itself, only the followed result is cached
+
+        Raises
+        ------
+        OSError:
+            If the path no longer exists or can't be stat'ed
+        """
+        if not follow_symlinks and self.is_symlink():
+            return os.lstat(self.path)
+        if self._stat is None:
+            self._stat = self._entry.stat() if self._entry is not None else os.stat(self.path)
+        return self._stat
+
+    @property
+    def size(self) -> int:
+        """The size of the path in bytes"""
+        return self.stat().st_size
+
+    @property
+    def mtime(self) -> float:
+        """The last modification time of the path in seconds since the epoch"""
+        return self.stat().st_mtime
+
+    @property
+    def inode(self) -> int:
+        """The inode number of the path"""
+        return self.stat().st_ino
+
+
+class PathStatCache:
+    """An opt-in cache of directory checks and listings that can be shared across paths calls
+
+    Entries expire after ttl seconds, and once there are more than max_size entries the least
+    recently used are evicted. Pass the same instance as the cache parameter of postprocess_paths()
+    (or any of the other pipeline functions) on every call to reuse results between calls.
+
+    Attributes
+    ----------
+    ttl : (float)
+        How many seconds a cached result stays valid
+
+    max_size : (int)
+        The maximum number of results (directory checks and listings) to keep
+
+    hits : (int)
+        How many lookups were answered from the cache
+
+    misses : (int)
+        How many lookups had to go to the filesystem
+
+    Notes
+    -----
+    - Relative paths are cached as given, so invalidate the cache if the current directory changes
+    - Instances are thread safe, so a cache can be used with the workers parameter
+
+    Examples
+    --------
+    Re-expanding the same configured directories every few seconds in a service
+
+    ```
+    from sdu.paths import PathStatCache, process_paths
+
+    cache = PathStatCache(ttl=10, max_size=10000)
+
+    while True:
+        directories = process_paths(['~/Development/*', '/srv/**'], cache=cache)
+        ...
+        print(cache.hits, cache.misses) # Check the cache is actually helping
+    ```
+    """
+    def __init__(self, ttl:float = 5.0, max_size:int = 4096):
+        if ttl < 0:
+            raise ValueError(f"ttl must be 0 or more, got {ttl}")
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # Maps (kind, path) to (expiry time, result), oldest first
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"PathStatCache(ttl={self.ttl}, max_size={self.max_size}, size={len(self)}, hits={self.hits}, misses={self.misses})"
+
+    def _lookup(self, kind:str, path:str, compute):
+        """Returns the cached result for (kind, path), calling compute(path) to fill it on a miss"""
+        key = (kind, path)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        result = compute(path) # Outside the lock so slow filesystems don't serialize other threads
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return result
+
+    def isdir(self, path:str) -> bool:
+        """Cached version of os.path.isdir()
+
+        Parameters
+        ----------
+        path : (str)
+            The path to check
+
+        Returns
+        -------
+        bool:
+            Whether the path is an existing directory
+        """
+        return self._lookup("isdir", path, os.path.isdir)
+
+    def listdir(self, path:str) -> list:
+        """Cached version of list(os.scandir())
+
+        Parameters
+        ----------
+        path : (str)
+            The directory to list
+
+        Returns
+        -------
+        list[os.DirEntry]:
+            The entries of the directory, empty if it's missing, unreadable or not a directory
+        """
+        return self._lookup("listdir", path, _scandir_entries)
+
+    def invalidate(self, path:Optional[str] = None):
+        """Removes cached results so they're recomputed on their next lookup
+
+        Parameters
+        ----------
+        path : (str or None)
+            Removes results for this path and everything below it, or every result if None
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            prefix = path.rstrip("\\/") + os.sep
+            for key in [key for key in self._entries if key[1] == path or key[1].startswith(prefix)]:
+                del self._entries[key]
+
+
+class ExpansionIndex:
+    """A persistent on-disk index of wildcard expansions, for short lived processes that expand the same patterns on every start
+
+    Each pattern's expansion is stored in an sqlite database along with the mtime of every directory
+    that was looked in to produce it. On later runs (in any process) the expansion is reused as long as
+    none of those directories have changed, which only needs a stat per directory instead of listing them.
+    Stale expansions are recomputed and stored transparently. Pass an instance as the index parameter
+    of postprocess_paths() (or any of the other pipeline functions).
+
+    Attributes
+    ----------
+    path : (str)
+        The path to the sqlite database file
+
+    hits : (int)
+        How many expansions were reused from the index
+
+    misses : (int)
+        How many expansions were missing or stale and had to be recomputed
+
+    Notes
+    -----
+    - Only paths with wildcards are indexed, plain directories are just checked directly
+    - Changes are detected through directory mtimes, so changes on filesystems with coarse
+        mtimes (i.e. 2 seconds on FAT) that happen within the same tick can be missed
+    - Changes inside the target of a symlink are only detected if the target was listed during expansion
+
+    Examples
+    --------
+    Reusing expansions between runs of a CLI
+
+    ```
+    import os
+    from sdu.paths import ExpansionIndex, process_paths
+
+    with ExpansionIndex(os.path.expanduser('~/.cache/my-cli/paths.sqlite3')) as index:
+        directories = process_paths(['~/Development/*/*', '~/Documents/**'], index=index)
+    ```
+    """
+    def __init__(self, path:str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        parent_directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent_directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None) # Autocommit
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""CREATE TABLE IF NOT EXISTS expansions (
+            pattern TEXT NOT NULL,
+            options TEXT NOT NULL,
+            results TEXT NOT NULL,
+            dependencies TEXT NOT NULL,
+            PRIMARY KEY (pattern, options)
+        )""")
+
+    def __enter__(self) -> "ExpansionIndex":
+        return self
+
+    def __exit__(self, *exception_info):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM expansions").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"ExpansionIndex(path={self.path!r}, hits={self.hits}, misses={self.misses})"
+
+    def close(self):
+        """Closes the connection to the database"""
+        with self._lock:
+            self._connection.close()
+
+    def invalidate(self, pattern:Optional[str] = None):
+        """Removes stored expansions so they're recomputed on their next use
+
+        Parameters
+        ----------
+        pattern : (str or None)
+            The localized pattern (as passed to postprocess_paths()) to remove, or every pattern if None
+        """
+        with self._lock:
+            if pattern is None:
+                self._connection.execute("DELETE FROM expansions")
+            else:
+                self._connection.execute("DELETE FROM expansions WHERE pattern = ?", (_localize_path(pattern),))
+
+    def _expand(self, pattern:str, options:_ExpansionOptions) -> list:
+        """Returns the expansion of a localized pattern, from the index if it's still valid
+
+        Parameters
+        ----------
+        pattern : (str)
+            The localized glob pattern to expand
+
+        options : (_ExpansionOptions)
+            The options to expand the pattern with, expansions with different options are stored separately
+
+        Returns
+        -------
+        list[str]:
+            The expanded paths
+        """
+        key = json.dumps([
+            options.include_files,
+            options.max_depth,
+            options.exclude.pattern if options.exclude else None,
+            options.follow_symlinks,
+        ])
+        with self._lock:
+            row = self._connection.execute("SELECT results, dependencies FROM expansions WHERE pattern = ? AND options = ?", (pattern, key)).fetchone()
+
+        if row is not None:
+            dependencies = json.loads(row[1])
+            if all(_directory_mtime(directory) == mtime for directory, mtime in dependencies.items()):
+                with self._lock:
+                    self.hits += 1
+                return json.loads(row[0])
+
+        # Bypasses any PathStatCache, a cached listing older than the mtimes recorded with it would be indexed as current
+        results, dependencies = _expand_with_dependencies(pattern, options._replace(cache=None))
+        with self._lock:
+            self.misses += 1
+            self._connection.execute(
+                "INSERT OR REPLACE INTO expansions (pattern, options, results, dependencies) VALUES (?, ?, ?, ?)",
+                (pattern, key, json.dumps(results), json.dumps(dependencies))
+            )
+        return results
+
+
+class _PathSetNode:
+    """A single path component in a PathSet trie"""
+    __slots__ = ("children", "member")
+
+    def __init__(self):
+        self.children = None # Maps component to _PathSetNode, None until the node has children
+        self.member = False  # Whether the path ending at this node is in the set
+
+
+class PathSet:
+    """A set of paths stored as a trie over their components
+
+    Paths sharing a prefix share the nodes for it, and membership and ancestor queries take
+    time proportional to the depth of the path being queried instead of the size of the set.
+    Paths are normalized (os.path.normpath, and os.path.normcase on windows) before being stored.
+
+    Parameters
+    ----------
+    paths : (Iterable[str] or None)
+        The paths to start the set with
+
+    Examples
+    --------
+    Checking if paths are under any of the configured roots
+
+    ```
+    from sdu.paths import PathSet, process_paths
+
+    roots = process_paths(['~/Development/*', '~/Documents'], as_pathset=True)
+    roots.collapse() # Remove any roots that are inside another root
+
+    print(roots.covers('~/Documents/notes/todo.md')) # Prints: True
+    print(roots.ancestor('/tmp/file.txt')) # Prints: None
+    ```
+    """
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, paths:Optional[Iterable[str]] = None):
+        self._root = _PathSetNode()
+        self._size = 0
+        if paths is not None:
+            for path in paths:
+                self.add(path)
+
+    @staticmethod
+    def _components(path:str) -> list:
+        """Splits a path into its normalized components i.e. '/home/kieran/' -> ['/', 'home', 'kieran']"""
+        path = os.path.normcase(os.path.normpath(os.path.expanduser(path)))
+        drive, path = os.path.splitdrive(path)
+        components = []
+        if drive or path.startswith(os.sep):
+            components.append(drive + (os.sep if path.startswith(os.sep) else ""))
+        components.extend(component for component in path.split(os.sep) if component and component != os.curdir)
+        return components
+
+    def _find(self, path:str) -> Optional[_PathSetNode]:
+        """Returns the node for path, or None if no stored path passes through it"""
+        node = self._root
+        for component in self._components(path):
+            if not node.children or component not in node.children:
+                return None
+            node = node.children[component]
+        return node
+
+    def _iterate(self, node:_PathSetNode, components:list) -> Iterator[str]:
+        """Yields every member at or below node, whose components are given"""
+        stack = [(node, components)]
+        while stack:
+            node, components = stack.pop()
+            if node.member:
+                yield os.path.join(*components) if components else os.curdir
+            if node.children:
+                for component, child in reversed(list(node.children.items())):
+                    stack.append((child, components + [component]))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, path:str) -> bool:
+        node = self._find(path)
+        return node is not None and node.member
+
+    def __iter__(self) -> Iterator[str]:
+        return self._iterate(self._root, [])
+
+    def __repr__(self) -> str:
+        return f"PathSet({list(self)})"
+
+    def add(self, path:str):
+        """Adds a path to the set
+
+        Parameters
+        ----------
+        path : (str)
+            The path to add
+        """
+        node = self._root
+        for component in self._components(path):
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(component)
+            if child is None:
+                child = node.children[component] = _PathSetNode()
+            node = child
+        if not node.member:
+            node.member = True
+            self._size += 1
+
+    def discard(self, path:str):
+        """Removes a path from the set if it's present, paths below it are kept
+
+        Parameters
+        ----------
+        path : (str)
+            The path to remove
+        """
+        components = self._components(path)
+        nodes = [self._root]
+        for component in components:
+            if not nodes[-1].children or component not in nodes[-1].children:
+                return
+            nodes.append(nodes[-1].children[component])
+        if not nodes[-1].member:
+            return
+        nodes[-1].member = False
+        self._size -= 1
+
+        # Prune nodes that no longer lead to any member
+        for depth in range(len(components), 0, -1):
+            node = nodes[depth]
+            if node.member or node.children:
+                break
+            parent = nodes[depth - 1]
+            del parent.children[components[depth - 1]]
+            if not parent.children:
+                parent.children = None
+
+    def ancestor(self, path:str) -> Optional[str]:
+        """Finds the shallowest member of the set that path is equal to or below
+
+        Parameters
+        ----------
+        path : (str)
+            The path to find the ancestor of
+
+        Returns
+        -------
+        str or None:
+            The (normalized) member path is under, or None if it's not under any of them
+        """
+        node = self._root
+        walked = []
+        if node.member: # The current directory is a member, and covers every relative path
+            return os.curdir
+        for component in self._components(path):
+            if not node.children or component not in node.children:
+                return None
+            node = node.children[component]
+            walked.append(component)
+            if node.member:
+                return os.path.join(*walked)
+        return None
+
+    def covers(self, path:str) -> bool:
+        """Checks if path is equal to or below any member of the set
+
+        Parameters
+        ----------
+        path : (str)
+            The path to check
+
+        Returns
+        -------
+        bool:
+            True if path is a member or is inside a member
+        """
+        return self.ancestor(path) is not None
+
+    def descendants(self, path:str) -> Iterator[str]:
+        """Yields every member of the set that is equal to or below path
+
+        Parameters
+        ----------
+        path : (str)
+            The path to find the members below
+
+        Yields
+        ------
+        str:
+            Each (normalized) member at or below path
+        """
+        node = self._find(path)
+        if node is not None:
+            yield from self._iterate(node, self._components(path))
+
+    def collapse(self) -> "PathSet":
+        """Removes every member that is below another member i.e. ~/dev/project is removed if ~/dev is a member
+
+        Returns
+        -------
+        PathSet:
+            The set itself, to allow chaining
+        """
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.member:
+                if node.children: # Everything below a member is redundant
+                    self._size -= sum(1 for _ in self._iterate(node, [])) - 1
+                    node.children = None
+                continue
+            if node.children:
+                stack.extend(node.children.values())
+        return self
+
+
+class PathWatcher:
+    """Keeps the expansion of a list of paths current, re-expanding only the paths whose directories changed
+
+    When created, each path is expanded and the mtime of every directory its expansion looked in is
+    snapshotted. Each call to poll() then only stats those directories, and re-expands the paths
+    whose directories have changed (something was added, removed or renamed in them). This works on
+    any filesystem, without OS specific notification services.
+
+    Parameters
+    ----------
+    paths : (list or tuple)
+        A list or tuple of paths, can be relative or absolute. See process_paths() for details.
+
+    include_files : (bool)
+        Whether to include file results
+
+    max_depth, exclude, follow_symlinks :
+        See postprocess_paths()
+
+    Notes
+    -----
+    - Changes are detected through directory mtimes, see ExpansionIndex for the limitations of that
+    - A path produced by more than one of the watched paths is only reported as removed once none of them produce it
+
+    Examples
+    --------
+    Keeping a set of project directories current in a service
+
+    ```
+    from sdu.paths import PathWatcher
+
+    watcher = PathWatcher(['~/Development/*', '~/Documents/**'], exclude=['node_modules'])
+    print(watcher.paths) # The current expansion
+
+    for added, removed in watcher.watch(interval=5):
+        print(f"Added: {added}, Removed: {removed}")
+    ```
+    """
+    def __init__(self, paths:Union[list, tuple], include_files:bool = False, max_depth:Optional[int] = None, exclude:Optional[list] = None, follow_symlinks:bool = True):
+        if not type(paths) == list and not type(paths) == tuple:
+            raise ValueError("Paths must be specified as a list or tuple")
+        self._options = _expansion_options(include_files, True, max_depth, exclude, follow_symlinks)
+        self._patterns = [_localize_path(directory) for directory in preprocess_paths(paths)]
+        self._results = []
+        self._dependencies = []
+        self._counts = {} # How many of the watched paths produce each result
+        for pattern in self._patterns:
+            results, dependencies = self._expand(pattern)
+            self._results.append(results)
+            self._dependencies.append(dependencies)
+            for path in results:
+                self._counts[path] = self._counts.get(path, 0) + 1
+
+    def __repr__(self) -> str:
+        return f"PathWatcher({self._patterns})"
+
+    @property
+    def paths(self) -> list:
+        """The current expansion of the watched paths, same as process_paths() would return"""
+        return [path for results in self._results for path in results]
+
+    def _expand(self, pattern:str) -> tuple:
+        """Expands a localized pattern, returning the results and the directories (with mtimes) they depend on"""
+        if "*" in pattern or "[" in pattern:
+            return _expand_with_dependencies(pattern, self._options)
+        results = [pattern] if os.path.isdir(pattern) else []
+        parent_directory = os.path.dirname(pattern.rstrip("\\/")) # Adding or removing the directory changes its parent
+        return results, {parent_directory: _directory_mtime(parent_directory)}
+
+    def poll(self) -> tuple:
+        """Checks for changes since the last poll (or since the watcher was created)
+
+        Returns
+        -------
+        tuple[list[str], list[str]]:
+            The paths that were added, and the paths that were removed
+        """
+        mtimes = {} # Directories shared between watched paths are only stat'ed once per poll
+        added = []
+        removed = []
+        for position, pattern in enumerate(self._patterns):
+            changed = False
+            for directory, mtime in self._dependencies[position].items():
+                if directory not in mtimes:
+                    mtimes[directory] = _directory_mtime(directory)
+                if mtimes[directory] != mtime:
+                    changed = True
+                    break
+            if not changed:
+                continue
+
+            results, dependencies = self._expand(pattern)
+            previous_results = set(self._results[position])
+            current_results = set(results)
+            for path in self._results[position]:
+                if path not in current_results:
+                    self._counts[path] -= 1
+                    if not self._counts[path]:
+                        del self._counts[path]
+                        removed.append(path)
+            for path in results:
+                if path not in previous_results:
+                    self._counts[path] = self._counts.get(path, 0) + 1
+                    if self._counts[path] == 1:
+                        added.append(path)
+            self._results[position] = results
+            self._dependencies[position] = dependencies
+
+        # A path moved between watched paths in the same poll is neither added nor removed
+        moved = set(added) & set(removed)
+        if moved:
+            added = [path for path in added if path not in moved]
+            removed = [path for path in removed if path not in moved]
+        return added, removed
+
+    def watch(self, interval:float = 1.0) -> Iterator[tuple]:
+        """Polls forever, yielding each time there are changes
+
+        Parameters
+        ----------
+        interval : (float)
+            How many seconds to wait between polls
+
+        Yields
+        ------
+        tuple[list[str], list[str]]:
+            The paths that were added, and the paths that were removed
+        """
+        while True:
+            added, removed = self.poll()
+            if added or removed:
+                yield added, removed
+            time.sleep(interval)
+
+
+class ExecutableIndex:
+    """An index of the executables on PATH, similar to bash's hash table
+
+    PATH is scanned once with os.scandir() and every command name is mapped to the absolute path
+    that would run, so lookups are dictionary reads instead of a stat per PATH directory. The index
+    rebuilds itself lazily when PATH changes, or when one of its directories has a new mtime
+    (something was installed, removed or renamed in it).
+
+    Parameters
+    ----------
+    path : (str or None)
+        A PATH style string of directories to index, or None to follow the PATH environment variable
+
+    ttl : (float)
+        How many seconds to trust the directory mtimes for before checking them again, 0 checks on every lookup
+
+    Attributes
+    ----------
+    rebuilds : (int)
+        How many times PATH has been scanned
+
+    Notes
+    -----
+    - Empty and repeated PATH entries are skipped, like shutil.which()
+    - On windows commands are matched case insensitively, with or without one of the PATHEXT extensions
+    - Files made executable (chmod) without being added, removed or renamed don't change the directory mtime, call refresh() after doing so
+    - Instances are thread safe
+
+    Examples
+    --------
+    Resolving many commands, and finding commands shadowed by other installs
+
+    ```
+    from sdu.paths import ExecutableIndex
+
+    executables = ExecutableIndex()
+
+    print(executables.which('python')) # Prints: '/usr/bin/python'
+    print(executables.shadowed()) # Prints: {'/usr/local/bin/python': '/usr/bin/python'}
+    ```
+    """
+    def __init__(self, path:Optional[str] = None, ttl:float = 1.0):
+        if ttl < 0:
+            raise ValueError(f"ttl must be 0 or more, got {ttl}")
+        self.ttl = ttl
+        self.rebuilds = 0
+        self._path = path
+        self._indexed_path = None # The PATH value the index was built from
+        self._mtimes = []         # (directory, mtime) of each indexed directory, in PATH order
+        self._commands = {}       # Maps each command name to the first path that provides it
+        self._locations = {}      # Maps each command name to every path that provides it, in PATH order
+        self._checked = 0.0       # When the directory mtimes were last checked
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._validate()
+        return len(self._commands)
+
+    def __contains__(self, name:str) -> bool:
+        return self.which(name) is not None
+
+    def __repr__(self) -> str:
+        return f"ExecutableIndex(directories={len(self._mtimes)}, commands={len(self._commands)}, rebuilds={self.rebuilds})"
+
+    @property
+    def directories(self) -> list:
+        """The directories that are indexed, in PATH order"""
+        self._validate()
+        return [directory for directory, _ in self._mtimes]
+
+    def _current_path(self) -> str:
+        if self._path is not None:
+            return self._path
+        return os.environ.get("PATH", os.defpath)
+
+    def _validate(self):
+        """Rebuilds the index if PATH changed, or (at most every ttl seconds) if an indexed directory changed"""
+        path = self._current_path()
+        now = time.monotonic()
+        if path == self._indexed_path and now - self._checked < self.ttl:
+            return
+        with self._lock:
+            if path == self._indexed_path:
+                if now - self._checked < self.ttl:
+                    return
+                self._checked = now
+                if all(_directory_mtime(directory) == mtime for directory, mtime in self._mtimes):
+                    return
+            self._build(path)
+            self._checked = now
+
+    def _build(self, path:str):
+        """Scans every directory in path, replacing the index"""
+        if os.name == "nt":
+            extensions = [extension.lower() for extension in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(os.pathsep) if extension]
+        mtimes = []
+        commands = {}
+        locations = {}
+        seen = set()
+        for directory in path.split(os.pathsep):
+            directory = directory.strip()
+            if not directory or os.path.normcase(directory) in seen:
+                continue
+            seen.add(os.path.normcase(directory))
+            mtimes.append((directory, _directory_mtime(directory))) # Taken before listing, so changes during the scan trigger a rebuild
+
+            found = {} # Maps each command name in this directory to its path
+            for entry in _scandir_entries(directory):
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if os.name == "nt":
+                    name = entry.name.lower()
+                    extension = os.path.splitext(name)[1]
+                    if extension not in extensions:
+                        continue
+                    found.setdefault(name, entry.path)
+                    stem = name[:-len(extension)]
+                    # With more than one extension for a command, PATHEXT order decides which runs
+                    if stem not in found or extensions.index(extension) < extensions.index(os.path.splitext(found[stem])[1].lower()):
+                        found[stem] = entry.path
+                elif os.access(entry.path, os.X_OK):
+                    found[entry.name] = entry.path
+
+            for name, executable in found.items():
+                commands.setdefault(name, executable)
+                locations.setdefault(name, []).append(executable)
+
+        self._indexed_path = path
+        self._mtimes = mtimes
+        self._commands = commands
+        self._locations = locations
+        self.rebuilds += 1
+        logging.info(f"Indexed {len(commands)} executables across {len(mtimes)} directories")
+
+    def refresh(self):
+        """Rescans PATH now, regardless of whether anything appears to have changed"""
+        with self._lock:
+            self._build(self._current_path())
+            self._checked = time.monotonic()
+
+    def which(self, name:str) -> Optional[str]:
+        """Indexed version of shutil.which()
+
+        Parameters
+        ----------
+        name : (str)
+            The command to look up, if it contains a directory it's checked directly instead
+
+        Returns
+        -------
+        str or None:
+            The path to the executable that would run, or None if there isn't one
+        """
+        if os.path.dirname(name):
+            return shutil.which(name)
+        self._validate()
+        if os.name == "nt":
+            name = name.lower()
+        return self._commands.get(name)
+
+    def locations(self, name:str) -> list:
+        """Every path that provides a command, in PATH order
+
+        Parameters
+        ----------
+        name : (str)
+            The command to look up
+
+        Returns
+        -------
+        list[str]:
+            The paths, the first being the one that runs. Empty if the command isn't on PATH
+        """
+        self._validate()
+        if os.name == "nt":
+            name = name.lower()
+        return list(self._locations.get(name, []))
+
+    def duplicates(self) -> dict:
+        """Finds the commands provided by more than one PATH directory
+
+        Returns
+        -------
+        dict[str, list[str]]:
+            Maps each duplicated command to every path that provides it, in PATH order
+        """
+        self._validate()
+        return {name: list(paths) for name, paths in self._locations.items() if len(paths) > 1}
+
+    def shadowed(self) -> dict:
+        """Finds the executables that never run, because the same command is earlier on PATH
+
+        Returns
+        -------
+        dict[str, str]:
+            Maps each shadowed executable to the executable that runs instead
+        """
+        self._validate()
+        return {path: paths[0] for paths in self._locations.values() if len(paths) > 1 for path in paths[1:]}
+
+
+def which(name:str) -> Optional[str]:
+    """Indexed version of shutil.which(), using a shared ExecutableIndex that follows PATH
+
+    Parameters
+    ----------
+    name : (str)
+        The command to look up
+
+    Example
+    -------
+    Resolving the same commands many times only scans PATH once
+
+    ```
+    from sdu.paths import which
+
+    for command in ['git', 'python', 'node'] * 100:
+        print(which(command)) # Prints: '/usr/bin/git', '/usr/bin/python', None ...
+    ```
+
+    Returns
+    -------
+    str or None:
+        The path to the executable that would run, or None if there isn't one
+    """
+    global _executable_index
+    if _executable_index is None:
+        _executable_index = ExecutableIndex()
+    return _executable_index.which(name)
+
+
+def add_to_path(program_path:str):
+    """Takes in a path to a program and adds it to the sytem PATH variable
+
+    Parameters
+    ----------
+    program_path : str
+        The path to the installation folder of the application
+
+    Notes
+    -----
+    * The path must be an absolute path
+    * The linux version of the command assumes you're using ~/.bashrc
+    * Because there are so many possible ways this can fail, there are no catches in place
+    * Adding a path that's already exported in the rc file (or in the user PATH on windows) does nothing, see add_many_to_path() for details
+
+    Raises
+    ------
+    ValueError:
+        If path provided is not a valid path to a directory
+
+    Examples
+    --------
+    Add a folder in the downloads folder called /micro editor/micro-1.4.1
+    ```
+    from sdu.paths import add_to_path, process_paths
+
+    program_path = f"C:\\Users\\Kieran\\Downloads\\micro editor\\micro-1.4.1" # Path that contains the executeable
+    add_to_path(program_path) # Adds the program_path to the path variable
+    ```
+    """
+    program_path = os.path.abspath(program_path)
+    if add_many_to_path([program_path]):
+        print(f"Added {program_path} to path, please restart shell for changes to take effect")
+    else:
+        print(f"{program_path} was already added to path")
+
+
+def add_many_to_path(program_paths:Iterable[str], rc_file:Optional[str] = None) -> list:
+    """Takes in paths to programs and adds any that weren't already added to the sytem PATH variable in one write
+
+    Parameters
+    ----------
+    program_paths : (Iterable[str])
+        The paths to the installation folders of the applications
+
+    rc_file : (str or None)
+        The shell startup file to add exports to on *nix, defaults to ~/.bashrc
+
+    Notes
+    -----
+    * Every path is validated before anything is written, so either all the new paths are added or none are
+    * On *nix the rc file is read once, and a path is skipped if any existing ```export PATH=...``` line already includes it
+    * On windows a path is skipped if the user PATH in the registry already includes it
+    * Only those exports (or the registry) are checked, a path that's on the PATH of the current process some other way is still added
+    * On *nix the rc file is rewritten atomically (through a temporary file), following a symlinked rc file to its target
+    * The PATH of the current process is also updated, so the programs can be found without restarting
+    * New paths are put before the existing ones (in the rc file or user PATH, and in the current process), with the last path given first
+    * On windows new processes put the user PATH after the system PATH, so the new paths only come first within the user PATH
+
+    Raises
+    ------
+    ValueError:
+        If any path provided is not a valid path to a directory
+
+    Examples
+    --------
+    Add every program folder in ~/tools to PATH
+
+    ```
+    from sdu.paths import add_many_to_path, process_paths
+
+    added = add_many_to_path(process_paths(['~/tools/*']))
+    print(added) # Prints: ['/home/kieran/tools/micro', '/home/kieran/tools/ripgrep'] (any that weren't already exported)
+    ```
+
+    Returns
+    -------
+    list[str]:
+        The absolute paths that were added, in input order
+    """
+    if isinstance(program_paths, str):
+        raise ValueError("Paths must be specified as an iterable of paths, not a single string")
+    new_paths = []
+    for program_path in program_paths:
+        program_path = os.path.abspath(program_path)
+        if not os.path.isdir(program_path):
+            raise ValueError(f"Path provided is not a valid path: {program_path}")
+        if program_path not in new_paths:
+            new_paths.append(program_path)
+
+    if os.name == "nt": # Windows systems
+        import winreg # Allows access to the windows registry
+        import ctypes # Allows interface with low-level C API's
+
+        with winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER) as root: # Get the current user registry
+            with winreg.OpenKey(root, "Environment", 0, winreg.KEY_ALL_ACCESS) as key: # Go to the environment key
+                try:
+                    existing_path_value = winreg.QueryValueEx(key, "PATH")[0] # Grab the current path value
+                except FileNotFoundError: # The user has no PATH of their own yet
+                    existing_path_value = ""
+                existing_paths = {os.path.normcase(directory.rstrip("\\")) for directory in existing_path_value.split(";") if directory}
+                new_paths = [program_path for program_path in new_paths if os.path.normcase(program_path.rstrip("\\")) not in existing_paths]
+                if not new_paths:
+                    return []
+                # Prepends the new program paths to the current path value, in the same order as the *nix exports
+                new_path_value = ";".join(reversed(new_paths)) + ";" + existing_path_value
+                winreg.SetValueEx(key, "PATH", 0, winreg.REG_EXPAND_SZ, new_path_value) # Updated the path with the updated path
+
+            # Tell other processes to update their environment
+            HWND_BROADCAST = 0xFFFF
+            WM_SETTINGCHANGE = 0x1A
+            SMTO_ABORTIFHUNG = 0x0002
+            result = ctypes.c_long()
+            SendMessageTimeoutW = ctypes.windll.user32.SendMessageTimeoutW
+            SendMessageTimeoutW(HWND_BROADCAST, WM_SETTINGCHANGE, 0, u"Environment", SMTO_ABORTIFHUNG, 5000, ctypes.byref(result),) 
+    else: # If system is *nix
+        if rc_file is None:
+            rc_file = f"{os.getenv('HOME')}/.bashrc"
+        rc_file = os.path.realpath(rc_file) # Replace the target of a symlinked rc file, not the link
+        try:
+            with open(rc_file, "r") as bash_file:
+                contents = bash_file.read()
+        except FileNotFoundError:
+            contents = ""
+
+        exported = {directory for line in contents.splitlines() for directory in _path_exports(line)}
+        new_paths = [program_path for program_path in new_paths if program_path not in exported]
+        if not new_paths:
+            return []
+        additions = "".join(f'\nexport PATH="{program_path}:$PATH"\n' for program_path in new_paths)  # Add program paths to Path variable
+        _atomic_write(rc_file, contents + additions)
+
+    # Make the programs available to this process (and its children) right away
+    current_paths = os.environ.get("PATH", "").split(os.pathsep)
+    os.environ["PATH"] = os.pathsep.join([program_path for program_path in reversed(new_paths) if program_path not in current_paths] + [directory for directory in current_paths if directory])
+    logging.info(f"Added {len(new_paths)} paths to PATH")
+    return new_paths
+
+
+def compact_path(usage:Optional[dict] = None, rc_file:Optional[str] = None, apply:bool = True) -> list:
+    """Removes duplicate, missing and empty directories from PATH, optionally moving the most used directories first
+
+    Every command the shell looks up (and every miss) checks PATH directories in order, so a shorter
+    PATH with the busiest directories first makes lookups faster.
+
+    Parameters
+    ----------
+    usage : (dict or None)
+        Maps directories to how much they're used (i.e. how many commands run from them), busier directories are moved first
+
+    rc_file : (str or None)
+        The shell startup file to remove redundant add_to_path() exports from on *nix, defaults to ~/.bashrc
+
+    apply : (bool)
+        Whether to update the PATH of the current process and the rc file, or just return the compacted PATH
+
+    Notes
+    -----
+    * The first occurrence of a duplicated directory is kept, along with the order of the rest of PATH (besides usage ordering)
+    * Empty PATH entries (which mean the current directory on *nix) are removed
+    * Directories that can't be read are kept, since they may contain executables for other users
+    * Reordering by usage can change which executable runs when a command is in more than one directory, see ExecutableIndex.shadowed()
+    * Only the ```export PATH="...:$PATH"``` lines written by add_to_path() are removed from the rc file (duplicates, and missing or empty directories), everything else is left as is
+    * On windows only the PATH of the current process is compacted
+
+    Examples
+    --------
+    Compacting PATH, with the directories of the most used commands first
+
+    ```
+    from sdu.paths import compact_path
+
+    print(compact_path(usage={'/usr/bin': 500, '/home/kieran/.cargo/bin': 40})) # Prints: ['/usr/bin', '/home/kieran/.cargo/bin', '/usr/local/bin', '/bin']
+    ```
+
+    Returns
+    -------
+    list[str]:
+        The directories of the compacted PATH, in order
+    """
+    directories = []
+    seen = set()
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        normalized = os.path.normcase(os.path.normpath(directory)) if directory else ""
+        if not directory or normalized in seen:
+            continue
+        seen.add(normalized)
+        if _useful_directory(directory):
+            directories.append(directory)
+
+    if usage:
+        usage = {os.path.normcase(os.path.normpath(directory)): count for directory, count in usage.items()}
+        directories.sort(key=lambda directory: -usage.get(os.path.normcase(os.path.normpath(directory)), 0)) # Stable, so ties keep their PATH order
+
+    if apply:
+        if not os.name == "nt":
+            _compact_rc_file(rc_file if rc_file is not None else f"{os.getenv('HOME')}/.bashrc")
+        os.environ["PATH"] = os.pathsep.join(directories)
+    logging.info(f"Compacted PATH to {len(directories)} directories")
+    return directories
+
+
+def _useful_directory(directory:str) -> bool:
+    """Checks if a PATH directory exists and isn't empty, unreadable directories are assumed to be useful"""
+    try:
+        with os.scandir(directory) as entries:
+            return next(entries, None) is not None
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    except OSError:
+        return os.path.isdir(directory)
+
+
+def _compact_rc_file(rc_file:str):
+    """Removes the duplicate add_to_path() exports, and exports of missing or empty directories, from an rc file"""
+    rc_file = os.path.realpath(rc_file)
+    try:
+        with open(rc_file, "r") as bash_file:
+            lines = bash_file.read().splitlines(keepends=True)
+    except FileNotFoundError:
+        return
+
+    kept = []
+    seen = set()
+    for line in lines:
+        match = _ADD_TO_PATH_EXPORT_REGEX.match(line)
+        if match:
+            directory = match.group(1)
+            if directory in seen or not _useful_directory(directory):
+                if kept and not kept[-1].strip(): # Also remove the blank line add_to_path() writes before each export
+                    kept.pop()
+                continue
+            seen.add(directory)
+        kept.append(line)
+
+    if len(kept) != len(lines):
+        _atomic_write(rc_file, "".join(kept))
+
+
+def _path_exports(line:str) -> list:
+    """Finds the directories an ```export PATH=...``` line of a shell rc file adds to PATH
+
+    Parameters
+    ----------
+    line : (str)
+        A line from the rc file
+
+    Returns
+    -------
+    list[str]:
+        The directories added, empty if the line isn't a PATH export
+    """
+    match = _PATH_EXPORT_REGEX.match(line)
+    if not match:
+        return []
+    return [directory for directory in match.group(2).split(":") if directory and directory not in ("$PATH", "${PATH}")]
+
+
+def _atomic_write(file_path:str, contents:str):
+    """Replaces the contents of a file in one step, so readers never see a partially written file
+
+    Parameters
+    ----------
+    file_path : (str)
+        The file to replace, created if it doesn't exist (keeping the permissions of the existing file if it does)
+
+    contents : (str)
+        The new contents of the file
+    """
+    directory = os.path.dirname(file_path) or "."
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.")
+    try:
+        with os.fdopen(file_descriptor, "w") as temporary_file:
+            temporary_file.write(contents)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temporary_path)
+        else:
+            os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
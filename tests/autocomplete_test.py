@@ -1,5 +1,10 @@
+import io
+import os
+import time
+import shutil
+import subprocess
 import pytest
-from sdu.autocomplete import generate_bash_autocomplete, command, _stringify_list
+from sdu.autocomplete import generate_bash_autocomplete, write_bash_autocomplete, generate_lazy_bash_autocomplete, generate_bash_value_files, precompute_bash_providers, command, provider, _stringify_list
 
 def test_stringify_list():
     """Testing the _stringify_list() function from sdu/autocompletion.py
@@ -97,3 +102,201 @@ complete -o bashdefault -o default -o filenames -F _ahd ahd
 '''
 
     assert generate_bash_autocomplete("ahd", commands, write_file=False) == correct_output 
+
+def test_write_bash_autocomplete():
+    """Validates that write_bash_autocomplete() in sdu/autocompletion.py streams
+    the same text generate_bash_autocomplete() returns."""
+
+    commands =  [
+        command("docs", ["-a", "--api", "-o", "--offline"]),
+        command("register", []),
+        command("config", ["-e", "--export", "-i", "--import"])
+        ]
+
+    stream = io.StringIO()
+    assert write_bash_autocomplete("ahd", commands, stream) is None
+    assert stream.getvalue() == generate_bash_autocomplete("ahd", commands, write_file=False)
+
+    with pytest.raises(ValueError):
+        write_bash_autocomplete("ahd", tuple(commands), stream)
+
+
+def complete(script:str, words:list) -> list:
+    """Runs the completion function for words[0] from a generated script in bash, with the last word being completed"""
+    program = f"""{script}
+COMP_WORDS=({' '.join(f"'{word}'" for word in words)})
+COMP_CWORD={len(words) - 1}
+_{words[0]}
+echo "${{COMPREPLY[@]}}"
+"""
+    return subprocess.run(["bash", "-c", program], stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout.split()
+
+
+def test_nested_bash_generation():
+    """Validates that generate_bash_autocomplete() in sdu/autocompletion.py generates
+    per level completion for nested subcommands
+
+    Cases
+    -----
+    - Flat commands keep the original output unless nested is True
+    - Each level only offers its own arguments and subcommands
+    - Arguments before a subcommand are skipped
+    """
+    assert command("docs", ["-a"]).subcommands == ()
+    flat = [command("docs", ["-a", "--api"]), command("register", [])]
+    assert generate_bash_autocomplete("ahd", flat, write_file=False) == generate_bash_autocomplete("ahd", [command("docs", ["-a", "--api"], ()), command("register", [])], write_file=False)
+    assert "_ahd__docs $(( i + 1 ))" in generate_bash_autocomplete("ahd", flat, write_file=False, nested=True)
+
+    commands = [
+        command("remote", ["-v", "--verbose"], [
+            command("add", ["-f", "--fetch"], [command("origin", ["--tags"])]),
+            command("remove", []),
+        ]),
+        command("status", ["-s", "--short"])
+    ]
+    script = generate_bash_autocomplete("git", commands, write_file=False)
+    assert "_git_status" not in script
+
+    if not shutil.which("bash"):
+        pytest.skip("bash is needed to run the generated completions")
+    assert complete(script, ["git", ""]) == ["-h", "--help", "-v", "--version", "remote", "status"]
+    assert complete(script, ["git", "re"]) == ["remote"]
+    assert complete(script, ["git", "remote", ""]) == ["-v", "--verbose", "add", "remove"]
+    assert complete(script, ["git", "remote", "-v", "add", "--f"]) == ["--fetch"]
+    assert complete(script, ["git", "remote", "add", "origin", ""]) == ["--tags"]
+    assert complete(script, ["git", "status", "--"]) == ["--short"]
+
+
+def test_lazy_bash_generation(tmp_path):
+    """Validates that generate_lazy_bash_autocomplete() in sdu/autocompletion.py writes
+    a root file that only loads each command's file when it's completed
+
+    Cases
+    -----
+    - Files are written to the output directory
+    - Command functions aren't defined until the command is completed
+    - generate_bash_autocomplete() writes to the output directory
+    """
+    commands = [
+        command("remote", ["-v", "--verbose"], [command("add", ["-f", "--fetch"])]),
+        command("status", ["-s", "--short"])
+    ]
+    files = generate_lazy_bash_autocomplete("git", commands, output_dir=str(tmp_path))
+    root_file = str(tmp_path / "git.sh")
+    assert list(files) == [root_file, str(tmp_path / "git.d" / "remote.sh"), str(tmp_path / "git.d" / "status.sh")]
+    for file_path, text in files.items():
+        with open(file_path) as autocomplete_file:
+            assert autocomplete_file.read() == text
+    assert "_git__remote__add" not in files[root_file]
+
+    assert generate_bash_autocomplete("git", commands, output_dir=str(tmp_path)) == (tmp_path / "git.sh").read_text()
+
+    if not shutil.which("bash"):
+        pytest.skip("bash is needed to run the generated completions")
+    generate_lazy_bash_autocomplete("git", commands, output_dir=str(tmp_path))
+    assert complete(f"source {root_file}", ["git", ""]) == ["-h", "--help", "-v", "--version", "remote", "status"]
+    assert complete(f"source {root_file}\ndeclare -F _git__remote || echo not-loaded", ["git", "st"]) == ["not-loaded", "status"]
+    assert complete(f"source {root_file}", ["git", "remote", "add", "--f"]) == ["--fetch"]
+    assert complete(f"source {root_file}", ["git", "-v", "status", "-"]) == ["-s", "--short"]
+
+
+def test_value_completion(tmp_path):
+    """Validates that argument values are completed from inline lists when small,
+    and from sorted value files when large
+
+    Cases
+    -----
+    - Value files are sorted and deduplicated
+    - Completing a value with 0, 1 and 2+ characters typed
+    - Values that mostly share a long prefix
+    - Lazy loaded files include the value files
+    """
+    hosts = [f"{prefix}{index}" for prefix in ("web", "db", "cache") for index in range(200)] + ["x", "db1"]
+    skus = [f"SKU-{index:08d}" for index in range(5000)] + ["SKU-1", "ITEM-1"]
+    commands = [
+        command("ssh", ["--host", "--color"], values={"--host": hosts, "--color": ["auto", "always", "never"]}),
+        command("order", ["--sku"], values={"--sku": skus})
+    ]
+    files = generate_bash_value_files("tool", commands, output_dir=str(tmp_path), write_files=False)
+    values_dir = tmp_path / "tool.d" / "values"
+    assert sorted(files) == [str(values_dir / "_tool__order--sku"), str(values_dir / "_tool__ssh--host")]
+    assert files[str(values_dir / "_tool__ssh--host")].splitlines() == sorted(set(hosts))
+
+    script = generate_bash_autocomplete("tool", commands, output_dir=str(tmp_path))
+    assert sorted(os.listdir(values_dir)) == ["_tool__order--sku", "_tool__ssh--host"]
+    assert "web150" not in script and "always" in script
+
+    lazy_files = generate_lazy_bash_autocomplete("tool", commands, output_dir=str(tmp_path / "lazy"))
+    assert str(tmp_path / "lazy" / "tool.d" / "values" / "_tool__ssh--host") in lazy_files
+
+    if not shutil.which("bash"):
+        pytest.skip("bash is needed to run the generated completions")
+    assert complete(script, ["tool", "ssh", "--color", "a"]) == ["always", "auto"]
+    assert complete(script, ["tool", "ssh", "--host", "web19"]) == ["web19"] + [f"web{index}" for index in range(190, 200)]
+    assert len(complete(script, ["tool", "ssh", "--host", "d"])) == 200
+    assert len(complete(script, ["tool", "ssh", "--host", ""])) == 601
+    assert complete(script, ["tool", "ssh", "--host", "z"]) == []
+    assert complete(script, ["tool", "order", "--sku", "SKU-0000499"]) == [f"SKU-{index:08d}" for index in range(4990, 5000)]
+    assert complete(script, ["tool", "order", "--sku", "SKU-1"]) == ["SKU-1"]
+    assert len(complete(script, ["tool", "order", "--sku", "SKU-"])) == 5001
+    assert complete(script, ["tool", "order", "--sku", "I"]) == ["ITEM-1"]
+    assert complete(f"source {tmp_path / 'lazy' / 'tool.sh'}", ["tool", "ssh", "--host", "cache19"]) == ["cache19"] + [f"cache{index}" for index in range(190, 200)]
+
+
+def test_provider_completion(tmp_path, monkeypatch):
+    """Validates that provider values are completed from a precomputed cache file,
+    which is refreshed in the background once it expires
+
+    Cases
+    -----
+    - precompute_bash_providers() writes the expiry and values
+    - Only stale caches are rerun with stale_only
+    - Completing from a fresh cache, and from an expired cache (which is refreshed)
+    - A lock left by a killed refresh is taken over once it's stale
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert provider("echo a").ttl == 3600
+    commands = [
+        command("deploy", ["--branch"], values={"--branch": provider("printf 'main\\nmaster\\nfeature\\n'", ttl=60)})
+    ]
+    script = generate_bash_autocomplete("tool", commands, write_file=False)
+    assert "_sdu_complete_values" not in script
+
+    cache_path = str(tmp_path / "sdu" / "completions" / "_tool__deploy--branch")
+    assert precompute_bash_providers("tool", commands) == [cache_path]
+    with open(cache_path) as cache_file:
+        expiry, *values = cache_file.read().splitlines()
+    assert values == ["main", "master", "feature"]
+    assert time.time() + 50 < int(expiry) <= time.time() + 60
+    assert precompute_bash_providers("tool", commands, stale_only=True) == []
+
+    if not shutil.which("bash"):
+        pytest.skip("bash is needed to run the generated completions")
+    assert complete(script, ["tool", "deploy", "--branch", "ma"]) == ["main", "master"]
+
+    # Expired caches are still used, while a refresh runs in the background
+    with open(cache_path, "w") as cache_file:
+        cache_file.write("0\nold\n")
+    assert complete(script, ["tool", "deploy", "--branch", ""]) == ["old"]
+    for _ in range(50):
+        with open(cache_path) as cache_file:
+            if cache_file.read().splitlines()[1:] == ["main", "master", "feature"] and not os.path.exists(f"{cache_path}.lock"):
+                break
+        time.sleep(0.1)
+    else:
+        pytest.fail("The expired cache wasn't refreshed")
+    assert complete(script, ["tool", "deploy", "--branch", "f"]) == ["feature"]
+
+    # A lock left behind by a killed refresh
+    with open(cache_path, "w") as cache_file:
+        cache_file.write("0\nold\n")
+    os.mkdir(f"{cache_path}.lock")
+    os.utime(f"{cache_path}.lock", (time.time() - 3600, time.time() - 3600))
+    assert complete(script, ["tool", "deploy", "--branch", ""]) == ["old"]
+    for _ in range(50):
+        with open(cache_path) as cache_file:
+            if cache_file.read().splitlines()[1:] == ["main", "master", "feature"] and not os.path.exists(f"{cache_path}.lock"):
+                break
+        time.sleep(0.1)
+    else:
+        pytest.fail("The stale lock wasn't taken over")
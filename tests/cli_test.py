@@ -0,0 +1,188 @@
+"""This set of test to tests the cli module and it's functions"""
+
+# Standard Library Dependencies
+import os                # Used to build directory trees to remove & copy
+import shutil            # Used to ignore entries when copying
+
+# External Dependencies
+import pytest            # Used to validate errors are raised
+
+# Internal Dependencies
+from sdu.cli import *    # Functionality being tested
+
+
+def build_tree(root, directories:int = 20, files:int = 50):
+    """Creates a tree of nested directories full of files under root"""
+    for directory_index in range(directories):
+        directory = root / f"directory{directory_index}" / "nested"
+        directory.mkdir(parents=True)
+        for file_index in range(files):
+            (directory / f"file{file_index}").write_text("content")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Creating symlinks on windows requires admin, and the rmtree fallback has no progress updates")
+def test_remove_directory(tmp_path):
+    """Validates that sdu.cli.remove_directory removes whole trees without following symlinks
+
+    Cases
+    -----
+    - Nested directories full of files
+    - Symlinks to directories and files outside the tree, and broken symlinks
+    - Progress updates
+    """
+    tree = tmp_path / "tree"
+    build_tree(tree)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep.txt").write_text("keep")
+    os.symlink(outside, tree / "directory-link")
+    os.symlink(outside / "keep.txt", tree / "directory0" / "file-link")
+    os.symlink(tmp_path / "missing", tree / "broken-link")
+
+    updates = []
+    remove_directory(str(tree), workers=4, progress=updates.append)
+    assert not os.path.lexists(tree)
+    assert (outside / "keep.txt").read_text() == "keep"
+    assert updates == sorted(updates)
+    assert updates[-1] == 20 * 50 + 20 * 2 + 4 # Files, directories, links and the tree itself
+
+
+def test_remove_directory_errors(tmp_path):
+    """Validates that sdu.cli.remove_directory reports errors the same way as shutil.rmtree
+
+    Cases
+    -----
+    - Missing directory (Error, ignored or passed to onerror/onexc)
+    - Symlink to a directory (Error, target untouched)
+    - File (Error)
+    - Paths relative to dir_fd
+    """
+    missing = tmp_path / "missing"
+    with pytest.raises(FileNotFoundError):
+        remove_directory(str(missing))
+    remove_directory(str(missing), ignore_errors=True)
+    errors = []
+    remove_directory(str(missing), onerror=lambda function, path, exc_info: errors.append((path, exc_info[0])))
+    remove_directory(str(missing), onerror=print, onexc=lambda function, path, error: errors.append((path, type(error))))
+    assert errors == [(str(missing), FileNotFoundError)] * 2
+
+    target = tmp_path / "target"
+    build_tree(target, directories=1, files=1)
+    os.symlink(target, tmp_path / "link")
+    with pytest.raises(OSError):
+        remove_directory(str(tmp_path / "link"))
+    assert (target / "directory0" / "nested" / "file0").exists()
+
+    (tmp_path / "file").write_text("")
+    with pytest.raises(NotADirectoryError):
+        remove_directory(str(tmp_path / "file"))
+
+    if os.name != "nt": # Windows can't open directories
+        build_tree(tmp_path / "relative", directories=2, files=2)
+        directory_fd = os.open(str(tmp_path), os.O_RDONLY)
+        try:
+            remove_directory("relative", dir_fd=directory_fd)
+        finally:
+            os.close(directory_fd)
+        assert not os.path.lexists(tmp_path / "relative")
+
+
+def test_copy_directory(tmp_path):
+    """Validates that sdu.cli.copy_directory and sdu.cli.sync_directory copy trees like shutil.copytree
+
+    Cases
+    -----
+    - Nested directories full of files, with metadata
+    - Ignored entries and symlinks
+    - Existing destination (Error unless dirs_exist_ok)
+    - Missing source (Error, nothing created)
+    - Syncing only changed files
+    """
+    source = tmp_path / "source"
+    build_tree(source, directories=5, files=10)
+    (source / "big").write_bytes(os.urandom(3 * 2 ** 20))
+    (source / "skip.pyc").write_text("")
+    os.symlink("big", source / "link")
+    os.chmod(source / "big", 0o600)
+
+    updates = []
+    destination = tmp_path / "destination"
+    assert copy_directory(str(source), str(destination), workers=4, symlinks=True, ignore=shutil.ignore_patterns("*.pyc"), progress=updates.append) == str(destination)
+    assert (destination / "big").read_bytes() == (source / "big").read_bytes()
+    assert (destination / "directory4" / "nested" / "file9").read_text() == "content"
+    assert os.readlink(destination / "link") == "big"
+    assert not (destination / "skip.pyc").exists()
+    assert os.stat(destination / "big").st_mode == os.stat(source / "big").st_mode
+    assert int(os.stat(destination / "directory0").st_mtime) == int(os.stat(source / "directory0").st_mtime)
+    assert updates[-1] == 5 * 10 + 1
+
+    with pytest.raises(FileExistsError):
+        copy_directory(str(source), str(destination))
+    assert copy_directory(str(source), str(destination), dirs_exist_ok=True) == str(destination)
+
+    with pytest.raises(FileNotFoundError):
+        copy_directory(str(tmp_path / "missing"), str(tmp_path / "missing-copy"))
+    with pytest.raises(FileNotFoundError):
+        sync_directory(str(tmp_path / "missing"), str(tmp_path / "missing-copy"))
+    assert not os.path.lexists(tmp_path / "missing-copy")
+
+    # Only new and changed files are copied
+    assert sync_directory(str(source), str(destination), symlinks=True) == 0
+    (source / "directory0" / "nested" / "file0").write_text("changed content")
+    (source / "new").write_text("new")
+    assert sync_directory(str(source), str(destination), symlinks=True) == 2
+    assert (destination / "directory0" / "nested" / "file0").read_text() == "changed content"
+    assert sync_directory(str(source), str(tmp_path / "fresh")) == 5 * 10 + 4 # Nothing ignored, symlinks followed
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="Needs hard links")
+def test_copy_directory_same_file(tmp_path):
+    """Validates that sdu.cli.copy_directory never truncates the source when the destination is the same file
+
+    Cases
+    -----
+    - Destination hard linked to the source (Error, data untouched)
+    - Copying a tree onto itself (Error, data untouched)
+    """
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "data.txt").write_text("data")
+    backup = tmp_path / "backup"
+    backup.mkdir()
+    os.link(source / "data.txt", backup / "data.txt") # Same as cp -al
+
+    with pytest.raises(shutil.Error) as error:
+        copy_directory(str(source), str(backup), dirs_exist_ok=True)
+    assert error.value.args[0][0][:2] == (str(source / "data.txt"), str(backup / "data.txt"))
+    assert (source / "data.txt").read_text() == "data"
+
+    with pytest.raises(shutil.Error):
+        copy_directory(str(source), str(source), dirs_exist_ok=True)
+    with pytest.raises(shutil.Error):
+        sync_directory(str(source), str(backup))
+    assert (source / "data.txt").read_text() == "data"
+
+
+def test_copy_directory_kernel_copy_fallback(tmp_path, monkeypatch):
+    """Validates that sdu.cli.copy_directory falls back when a kernel copy reports nothing to copy
+
+    Cases
+    -----
+    - os.copy_file_range() copying nothing from a non-empty file (as on procfs, sysfs and some FUSE mounts)
+    - os.sendfile() doing the same, falling back to reads & writes
+    - Empty files
+    """
+    source = tmp_path / "source"
+    source.mkdir()
+    data = os.urandom(2 ** 20 + 1)
+    (source / "data").write_bytes(data)
+    (source / "empty").write_bytes(b"")
+
+    monkeypatch.setattr(os, "copy_file_range", lambda *arguments: 0, raising=False)
+    copy_directory(str(source), str(tmp_path / "first"))
+    assert (tmp_path / "first" / "data").read_bytes() == data
+
+    monkeypatch.setattr(os, "sendfile", lambda *arguments: 0, raising=False)
+    copy_directory(str(source), str(tmp_path / "second"))
+    assert (tmp_path / "second" / "data").read_bytes() == data
+    assert (tmp_path / "second" / "empty").read_bytes() == b""
@@ -2,7 +2,12 @@
 
 # Standard Library Dependencies
 import os                # Used to validate paths
+import asyncio           # Used to run the asyncio versions of the pipeline
 import glob              # Used to glob (expand) paths
+import time              # Used to control cache expiry
+
+# External Dependencies
+import pytest            # Used to validate errors are raised
 
 # Internal Dependencies
 from sdu.paths import * # Functionality being tested
@@ -30,6 +35,20 @@ def test_preprocess_paths():
         assert preprocess_paths(nix_paths) == ["~/Documents","~/Desktop/Development/*","~/Downloads","."]
 
 
+def test_preprocess_paths_windows_batch():
+    """Validates that %USERPROFILE% paths are normalized entry by entry.
+
+    Cases
+    -----
+    - Duplicate windows paths are each rewritten
+    - Lowercase drive letters and usernames
+    - Paths that only contain a windows path part way through are not rewritten
+    """
+    paths = ['C:\\Users\\Kieran\\Desktop\\*', 'C:\\Users\\Kieran\\Desktop\\*', 'c:/users/kieran', '/mnt/C:/Users/Kieran/Desktop']
+
+    assert preprocess_paths(paths) == ["~/Desktop/*", "~/Desktop/*", "~", "/mnt/C:/Users/Kieran/Desktop"]
+
+
 def test_postprocess_paths():
     """Validates that pre-processed paths are deserialized properly on a per OS basis.
     
@@ -92,4 +111,704 @@ def test_process_paths():
                 correct_paths.append(current_path)
         correct_paths.append(f"{os.getenv('HOME')}/Downloads")
         correct_paths.append(os.path.abspath("."))
-        assert process_paths(paths) == correct_paths
\ No newline at end of file
+        assert process_paths(paths) == correct_paths
+
+def test_iter_process_paths():
+    """Validates that the streaming pipeline yields the same results as the list based one.
+
+    Cases
+    -----
+    - Generators are accepted as input
+    - Each stage is lazy (nothing is consumed until iterated)
+    - Output matches preprocess_paths(), postprocess_paths() & process_paths()
+    - Plain strings raise a ValueError
+    """
+    paths = ['~/Documents', '~/Desktop/*' , '~\\Downloads' , '.']
+
+    consumed = []
+    def manifest():
+        for path in paths:
+            consumed.append(path)
+            yield path
+
+    results = iter_process_paths(manifest())
+    assert consumed == [] # Nothing is processed until results are requested
+
+    assert list(results) == process_paths(paths)
+    assert consumed == paths
+
+    assert list(iter_preprocess_paths(iter(paths))) == preprocess_paths(paths)
+    assert list(iter_postprocess_paths(iter(paths))) == postprocess_paths(paths)
+
+    with pytest.raises(ValueError):
+        list(iter_process_paths("~/Documents"))
+
+
+def test_postprocess_paths_workers(tmp_path):
+    """Validates that expanding paths on a thread pool gives the same results as expanding them serially.
+
+    Cases
+    -----
+    - Results are in input order regardless of which expansion finishes first
+    - Mount limits are respected
+    - Invalid worker counts raise a ValueError
+    """
+    for index in range(20):
+        (tmp_path / f"folder{index:02}" / "nested").mkdir(parents=True)
+        (tmp_path / f"file{index:02}.txt").write_text("")
+
+    paths = [str(tmp_path / f"folder{index:02}" / "*") for index in range(20)]
+    paths += [str(tmp_path / "*"), str(tmp_path / "missing"), str(tmp_path)]
+
+    expected = postprocess_paths(paths)
+    assert postprocess_paths(paths, workers=4) == expected
+    assert postprocess_paths(paths, include_files=True, workers=4) == postprocess_paths(paths, include_files=True)
+    assert postprocess_paths(paths, workers=4, mount_limits={str(tmp_path): 1}) == expected
+
+    with pytest.raises(ValueError):
+        postprocess_paths(paths, workers=-1)
+
+
+def test_scandir_glob(tmp_path, monkeypatch):
+    """Validates that the scandir based expansion engine matches glob.glob() + os.path.isdir().
+
+    Cases
+    -----
+    - Wildcards; *
+    - Single characters; ? (alongside another wildcard, a lone ? is treated literally)
+    - Character sets; [...]
+    - Multiple wildcard components with literal components between them
+    - Hidden files (only matched when the pattern starts with a .)
+    - Relative patterns
+    - Patterns that don't match anything
+    - Trailing separators (only directories match, and keep the separator)
+    """
+    for name in ("alpha", "beta", "gamma1", "gamma2", ".hidden"):
+        (tmp_path / name / "src").mkdir(parents=True)
+        (tmp_path / name / "README.md").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+    (tmp_path / ".env").write_text("")
+
+    patterns = ["*", "gamma?/*", "[ab]*", "*/src", "*/*", ".*", "*.txt", "missing/*", "alpha/[!s]*", "*/", "*/*/", "alpha/src/"]
+
+    def expected(pattern:str, include_files:bool) -> list:
+        return [path for path in glob.glob(pattern) if include_files or os.path.isdir(path)]
+
+    for pattern in patterns:
+        for include_files in (True, False):
+            absolute_pattern = os.path.join(str(tmp_path), pattern)
+            assert postprocess_paths([absolute_pattern], include_files=include_files) == expected(absolute_pattern, include_files)
+
+    monkeypatch.chdir(tmp_path)
+    for pattern in patterns:
+        assert sorted(postprocess_paths([pattern], include_files=True)) == sorted(expected(pattern, True))
+
+
+def test_recursive_wildcards(tmp_path):
+    """Validates recursive (**) expansion in postprocess_paths().
+
+    Cases
+    -----
+    - Matches the same directories as glob.glob(recursive=True)
+    - ** in the middle of a pattern
+    - A trailing separator after ** (only directories, keeping the separator)
+    - max_depth limits how far ** descends
+    - exclude prunes whole subtrees
+    - Symlink loops are not followed forever
+    - Results are streamed
+    """
+    for path in ("a/b/c/d", "a/node_modules/pkg/lib", "e/f", ".git/objects"):
+        (tmp_path / path).mkdir(parents=True)
+    (tmp_path / "a" / "b" / "notes.txt").write_text("")
+    (tmp_path / "a" / "b" / "c" / "src").mkdir()
+
+    root = str(tmp_path)
+
+    def expected(pattern:str, include_files:bool = False) -> list:
+        return [path.rstrip(os.sep) for path in glob.glob(pattern, recursive=True) if include_files or os.path.isdir(path)]
+
+    for pattern in ("**", os.path.join("**", "src"), os.path.join("a", "**", "*")):
+        pattern = os.path.join(root, pattern)
+        assert postprocess_paths([pattern]) == expected(pattern)
+        assert postprocess_paths([pattern], include_files=True) == expected(pattern, True)
+    assert postprocess_paths([os.path.join(root, "**", "")], include_files=True) == glob.glob(os.path.join(root, "**", ""), recursive=True)
+
+    assert postprocess_paths([os.path.join(root, "**")], max_depth=0) == [root]
+    assert postprocess_paths([os.path.join(root, "**")], max_depth=1) == [root] + expected(os.path.join(root, "*"))
+    assert not any("node_modules" in path for path in postprocess_paths([os.path.join(root, "**")], exclude=["node_modules"]))
+    assert postprocess_paths([os.path.join(root, "**", "lib")], exclude="node_*") == []
+
+    with pytest.raises(ValueError):
+        postprocess_paths([os.path.join(root, "**")], max_depth=-1)
+
+    if hasattr(os, "symlink") and os.name != "nt": # Creating symlinks on windows requires admin
+        os.symlink(str(tmp_path / "a"), str(tmp_path / "a" / "b" / "loop"))
+        results = postprocess_paths([os.path.join(root, "**")])
+        assert os.path.join(root, "a", "b", "loop") in results
+        assert os.path.join(root, "a", "b", "loop", "b") not in results
+        assert len(results) == len(set(results))
+        results = postprocess_paths([os.path.join(root, "**")], follow_symlinks=False)
+        assert os.path.join(root, "a", "b", "loop") in results
+        assert os.path.join(root, "a", "b", "loop", "c") not in results
+
+    results = iter_postprocess_paths([os.path.join(root, "**")])
+    assert next(results) == root
+
+
+def test_path_stat_cache(tmp_path, monkeypatch):
+    """Validates the PathStatCache shared between postprocess_paths() calls.
+
+    Cases
+    -----
+    - Results are the same with and without a cache
+    - Repeated calls are answered from the cache (hits/misses)
+    - Entries expire after the ttl
+    - The cache never grows past max_size
+    - Invalidating a path removes it and everything below it
+    """
+    for name in ("alpha", "beta", "gamma"):
+        (tmp_path / name / "src").mkdir(parents=True)
+    paths = [os.path.join(str(tmp_path), "*"), os.path.join(str(tmp_path), "**", "src"), str(tmp_path)]
+
+    cache = PathStatCache(ttl=60, max_size=100)
+    expected = postprocess_paths(paths)
+    assert postprocess_paths(paths, cache=cache) == expected
+    misses = cache.misses
+    assert cache.hits + misses > 0
+
+    assert postprocess_paths(paths, cache=cache) == expected
+    assert cache.misses == misses # Second call is answered from the cache entirely
+
+    (tmp_path / "delta").mkdir()
+    assert postprocess_paths(paths, cache=cache) == expected # Stale until invalidated or expired
+    cache.invalidate(str(tmp_path))
+    assert postprocess_paths(paths, cache=cache) == postprocess_paths(paths)
+
+    clock = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    cache = PathStatCache(ttl=5, max_size=2)
+    cache.isdir(str(tmp_path))
+    cache.isdir(str(tmp_path))
+    assert (cache.hits, cache.misses) == (1, 1)
+    clock[0] = 10.0
+    cache.isdir(str(tmp_path))
+    assert cache.misses == 2
+
+    for name in ("alpha", "beta", "gamma"):
+        cache.listdir(str(tmp_path / name))
+    assert len(cache) == 2
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+    with pytest.raises(ValueError):
+        PathStatCache(max_size=0)
+
+
+def test_expansion_index(tmp_path):
+    """Validates the persistent ExpansionIndex.
+
+    Cases
+    -----
+    - Results are the same with and without an index
+    - Unchanged expansions are reused, including by a new instance (process)
+    - Adding or removing directories anywhere the expansion looked recomputes it
+    - Different options are indexed separately
+    """
+    root = tmp_path / "tree"
+    for name in ("alpha", "beta"):
+        (root / name / "src").mkdir(parents=True)
+    (root / "notes.txt").write_text("")
+    paths = [os.path.join(str(root), "*"), os.path.join(str(root), "*", "src"), os.path.join(str(root), "**")]
+    database = str(tmp_path / "cache" / "index.sqlite3")
+
+    with ExpansionIndex(database) as index:
+        assert postprocess_paths(paths, index=index) == postprocess_paths(paths)
+        assert (index.hits, index.misses) == (0, 3)
+        assert postprocess_paths(paths, index=index) == postprocess_paths(paths)
+        assert (index.hits, index.misses) == (3, 3)
+
+    with ExpansionIndex(database) as index: # Reused across instances
+        assert len(index) == 3
+        assert postprocess_paths(paths, index=index) == postprocess_paths(paths)
+        assert index.misses == 0
+
+        (root / "gamma" / "src").mkdir(parents=True) # Changes root
+        assert postprocess_paths(paths, index=index) == postprocess_paths(paths)
+        (root / "gamma" / "src").rmdir() # Only changes gamma
+        assert postprocess_paths(paths, index=index) == postprocess_paths(paths)
+
+        assert postprocess_paths(paths[:1], include_files=True, index=index) == postprocess_paths(paths[:1], include_files=True)
+        assert len(index) == 4
+
+        index.invalidate(paths[0])
+        assert len(index) == 2
+        index.invalidate()
+        assert len(index) == 0
+
+
+def test_expansion_index_with_cache(tmp_path):
+    """Validates that using a PathStatCache and an ExpansionIndex together never indexes stale listings.
+
+    Cases
+    -----
+    - A directory created after the cache was warmed is indexed
+    - A new index (without a cache) returns the current expansion
+    """
+    (tmp_path / "d" / "a").mkdir(parents=True)
+    pattern = [os.path.join(str(tmp_path), "d", "*")]
+    database = str(tmp_path / "index.sqlite3")
+    cache = PathStatCache(ttl=60)
+    assert postprocess_paths(pattern, cache=cache) == [str(tmp_path / "d" / "a")] # Warms the cache
+
+    (tmp_path / "d" / "b").mkdir()
+    expected = [str(tmp_path / "d" / "a"), str(tmp_path / "d" / "b")]
+    with ExpansionIndex(database) as index:
+        assert sorted(postprocess_paths(pattern, cache=cache, index=index)) == expected
+    with ExpansionIndex(database) as index:
+        assert sorted(postprocess_paths(pattern, index=index)) == expected
+        assert index.hits == 1
+
+
+def test_async_paths(tmp_path):
+    """Validates the asyncio versions of the paths pipeline.
+
+    Cases
+    -----
+    - apostprocess_paths() and aprocess_paths() match their synchronous versions (including order)
+    - aiter_postprocess_paths() yields the same paths (in resolution order)
+    - Invalid concurrency raises a ValueError
+    """
+    for index in range(10):
+        (tmp_path / f"folder{index}" / "src").mkdir(parents=True)
+    paths = [str(tmp_path / f"folder{index}" / "*") for index in range(10)] + [str(tmp_path / "**")]
+
+    async def collect(iterator) -> list:
+        return [path async for path in iterator]
+
+    loop = asyncio.new_event_loop() # asyncio.run() is only available in 3.7+
+    try:
+        assert loop.run_until_complete(apostprocess_paths(paths, concurrency=3)) == postprocess_paths(paths)
+        assert loop.run_until_complete(aprocess_paths(paths, concurrency=3)) == process_paths(paths)
+        assert sorted(loop.run_until_complete(collect(aiter_postprocess_paths(paths, concurrency=3)))) == sorted(postprocess_paths(paths))
+
+        with pytest.raises(ValueError):
+            loop.run_until_complete(apostprocess_paths(paths, concurrency=0))
+    finally:
+        loop.close()
+
+
+def test_sharded_process_paths(tmp_path):
+    """Validates that sharding the pipeline across processes matches process_paths().
+
+    Cases
+    -----
+    - Results are in input order
+    - Duplicates (including across chunks) are removed
+    - Invalid chunk sizes raise a ValueError
+    """
+    for index in range(6):
+        (tmp_path / f"folder{index}" / "src").mkdir(parents=True)
+    paths = [str(tmp_path / f"folder{index}" / "*") for index in range(6)] + [str(tmp_path / "*"), str(tmp_path / "folder0" / "*")]
+
+    expected = []
+    for path in process_paths(paths):
+        if path not in expected:
+            expected.append(path)
+
+    assert sharded_process_paths(paths, processes=2, chunk_size=3) == expected
+    assert sharded_process_paths(tuple(paths), processes=1, chunk_size=100) == expected
+
+    with pytest.raises(ValueError):
+        sharded_process_paths(paths, chunk_size=0)
+
+
+def test_pathset(tmp_path):
+    """Validates the trie backed PathSet.
+
+    Cases
+    -----
+    - Duplicates are only stored once
+    - Membership, ancestor and descendant queries
+    - Collapsing removes paths below other paths
+    - Discarding removes only the given path
+    - process_paths(as_pathset=True) contains the same paths as process_paths()
+    """
+    root = os.path.abspath(os.sep)
+    dev = os.path.join(root, "home", "kieran", "dev")
+    project = os.path.join(dev, "project")
+    documents = os.path.join(root, "home", "kieran", "Documents")
+
+    paths = PathSet([dev, project, project + os.sep, documents])
+    assert len(paths) == 3
+    assert project in paths
+    assert os.path.join(dev, "other") not in paths
+    assert paths.ancestor(os.path.join(project, "src", "main.py")) == dev
+    assert paths.covers(os.path.join(documents, "notes.txt"))
+    assert not paths.covers(os.path.join(root, "home", "kieran"))
+    assert sorted(paths.descendants(dev)) == sorted([os.path.normcase(dev), os.path.normcase(project)])
+
+    paths.discard(dev)
+    assert dev not in paths and project in paths
+    assert paths.ancestor(os.path.join(project, "src")) == os.path.normcase(project)
+
+    paths.add(dev)
+    assert len(paths.collapse()) == 2
+    assert project not in paths
+    assert sorted(paths) == sorted([os.path.normcase(dev), os.path.normcase(documents)])
+
+    for name in ("alpha", "beta"):
+        (tmp_path / name).mkdir()
+    patterns = [str(tmp_path / "*"), str(tmp_path / "alpha"), str(tmp_path)]
+    pathset = process_paths(patterns, as_pathset=True)
+    assert isinstance(pathset, PathSet)
+    assert sorted(pathset) == sorted(set(os.path.normcase(path) for path in process_paths(patterns)))
+    assert len(pathset.collapse()) == 1
+
+
+def test_path_watcher(tmp_path):
+    """Validates that PathWatcher reports the changes to an expansion.
+
+    Cases
+    -----
+    - The initial expansion matches process_paths()
+    - Nothing is reported when nothing changed
+    - Added and removed directories are reported (for wildcard, recursive and plain paths)
+    - Only the paths whose directories changed are re-expanded
+    """
+    for name in ("alpha", "beta"):
+        (tmp_path / "projects" / name).mkdir(parents=True)
+    (tmp_path / "deep" / "a").mkdir(parents=True)
+    patterns = [str(tmp_path / "projects" / "*"), str(tmp_path / "deep" / "**"), str(tmp_path / "plain")]
+
+    watcher = PathWatcher(patterns)
+    assert watcher.paths == process_paths(patterns)
+    assert watcher.poll() == ([], [])
+
+    def touch_later(path):
+        """Makes sure a directory's mtime moves forward even on coarse filesystems"""
+        stat_result = os.stat(path)
+        os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+
+    (tmp_path / "projects" / "gamma").mkdir()
+    (tmp_path / "deep" / "a" / "b").mkdir()
+    (tmp_path / "plain").mkdir()
+    for directory in ("projects", os.path.join("deep", "a"), ""):
+        touch_later(str(tmp_path / directory))
+    added, removed = watcher.poll()
+    assert sorted(added) == sorted([str(tmp_path / "projects" / "gamma"), str(tmp_path / "deep" / "a" / "b"), str(tmp_path / "plain")])
+    assert removed == []
+    assert watcher.paths == process_paths(patterns)
+
+    expanded = []
+    original_expand = watcher._expand
+    watcher._expand = lambda pattern: expanded.append(pattern) or original_expand(pattern)
+    (tmp_path / "projects" / "alpha").rmdir()
+    touch_later(str(tmp_path / "projects"))
+    assert watcher.poll() == ([], [str(tmp_path / "projects" / "alpha")])
+    assert expanded == [patterns[0]]
+    assert watcher.paths == process_paths(patterns)
+
+
+def test_filters(tmp_path):
+    """Validates filters evaluated during expansion.
+
+    Cases
+    -----
+    - name_filter() include and exclude patterns
+    - type_filter()
+    - mtime_filter()
+    - size_filter()
+    - Filters apply to plain paths, wildcards, recursive wildcards and indexed expansions
+    - Filters are only evaluated on results, not on the directories walked to find them
+    """
+    (tmp_path / "src" / "package").mkdir(parents=True)
+    (tmp_path / "src" / "main.py").write_text("print('hello')")
+    (tmp_path / "src" / "package" / "module.py").write_text("")
+    (tmp_path / "src" / "package" / "data.bin").write_bytes(b"0" * 2048)
+    old_file = tmp_path / "src" / "old.py"
+    old_file.write_text("")
+    os.utime(str(old_file), (1000, 1000))
+
+    pattern = [os.path.join(str(tmp_path), "src", "**")]
+    def expand(*filters, include_files = True, paths = pattern, **options) -> list:
+        return sorted(os.path.relpath(path, str(tmp_path)) for path in postprocess_paths(paths, include_files=include_files, filters=list(filters), **options))
+
+    python_files = [os.path.join("src", "main.py"), os.path.join("src", "old.py"), os.path.join("src", "package", "module.py")]
+    assert expand(name_filter(include=["*.py"])) == python_files
+    assert expand(name_filter(include="*.py", exclude=["old*"])) == [python_files[0], python_files[2]]
+    assert expand(type_filter("dir")) == ["src", os.path.join("src", "package")]
+    assert expand(type_filter("file"), mtime_filter(older_than=2000)) == [python_files[1]]
+    assert expand(type_filter("file"), mtime_filter(newer_than=2000), name_filter(include=["*.py"])) == [python_files[0], python_files[2]]
+    assert expand(type_filter("file"), size_filter(min_size=1)) == [os.path.join("src", "main.py"), os.path.join("src", "package", "data.bin")]
+    assert expand(size_filter(max_size=1024), type_filter("file"), paths=[os.path.join(str(tmp_path), "src", "*", "*")]) == [os.path.join("src", "package", "module.py")]
+    assert expand(name_filter(include=["pack*"]), paths=[str(tmp_path / "src" / "package"), str(tmp_path / "src")]) == [os.path.join("src", "package")]
+
+    with ExpansionIndex(str(tmp_path / "index.sqlite3")) as index:
+        for _ in range(2):
+            assert expand(name_filter(include=["*.py"]), index=index) == python_files
+        assert index.hits == 1
+
+    with pytest.raises(ValueError):
+        type_filter("folder")
+
+
+def test_path_entries(tmp_path, monkeypatch):
+    """Validates PathEntry records returned by postprocess_paths(entries=True).
+
+    Cases
+    -----
+    - The same paths are returned as without entries
+    - Type information from the directory listing is carried without another stat
+    - Stat results gathered by filters are reused
+    - Stat based fields are computed lazily for plain paths
+    - Records are compact (__slots__) and os.DirEntry compatible
+    """
+    (tmp_path / "folder").mkdir()
+    (tmp_path / "file.txt").write_text("hello")
+    pattern = [os.path.join(str(tmp_path), "*")]
+
+    entries = postprocess_paths(pattern, include_files=True, entries=True)
+    assert [entry.path for entry in entries] == postprocess_paths(pattern, include_files=True)
+    assert not hasattr(entries[0], "__dict__")
+
+    stat_calls = []
+    original_stat = os.stat
+    monkeypatch.setattr(os, "stat", lambda *args, **kwargs: stat_calls.append(args) or original_stat(*args, **kwargs))
+    by_name = {entry.name: entry for entry in entries}
+    assert by_name["folder"].is_dir() and not by_name["folder"].is_file()
+    assert by_name["file.txt"].is_file() and not by_name["file.txt"].is_symlink()
+    assert stat_calls == [] # Types came from the directory listing
+
+    filtered = postprocess_paths(pattern, include_files=True, entries=True, filters=[type_filter("file"), size_filter(min_size=1)])
+    stat_calls.clear()
+    assert [entry.name for entry in filtered] == ["file.txt"]
+    assert filtered[0].size == 5
+    if os.name != "nt":
+        assert stat_calls == [] # Stat result was gathered by the filter
+
+    plain = postprocess_paths([str(tmp_path / "folder")], entries=True)[0]
+    assert plain.is_dir()
+    assert plain.mtime == original_stat(str(tmp_path / "folder")).st_mtime
+    assert os.fspath(plain) == str(tmp_path / "folder")
+    assert plain == PathEntry(str(tmp_path / "folder"))
+
+
+def test_canonicalize_path(tmp_path, monkeypatch):
+    """Validates the memoized canonicalize_path() used by preprocess_paths().
+
+    Cases
+    -----
+    - Repeated paths are served from the cache (including through preprocess_paths())
+    - Relative paths are re-resolved when the cwd changes
+    - ~ substitution follows HOME (*nix only, same as preprocess_paths())
+    """
+    canonicalize_path.cache_clear()
+    monkeypatch.chdir(tmp_path)
+
+    # Repeated paths are served from the cache
+    for _ in range(3):
+        assert canonicalize_path("C:\\Users\\Kieran\\Desktop") == "~/Desktop"
+    info = canonicalize_path.cache_info()
+    assert info.misses == 1 and info.hits == 2
+    assert preprocess_paths(["C:\\Users\\Kieran\\Desktop"]) == ["~/Desktop"]
+    assert canonicalize_path.cache_info().hits == 3
+
+    # Relative paths are re-resolved when the cwd changes (compared by their end, since on windows tmp_path may be collapsed to ~)
+    assert canonicalize_path("./folder").endswith(f"/{tmp_path.name}/folder")
+    (tmp_path / "other").mkdir()
+    monkeypatch.chdir(tmp_path / "other")
+    assert canonicalize_path("./folder").endswith(f"/{tmp_path.name}/other/folder")
+    assert canonicalize_path.cache_info().currsize == 1
+    if os.name != "nt":
+        assert canonicalize_path("./folder") == os.path.abspath("./folder")
+
+    # ~ substitution follows HOME
+    if os.name == "nt":
+        return
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert canonicalize_path(str(tmp_path / "other")) == "~/other"
+    assert canonicalize_path.cache_info().currsize == 1
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Executables are found by their PATHEXT extension on windows, not their mode")
+def test_executable_index(tmp_path, monkeypatch):
+    """Validates the ExecutableIndex behind which().
+
+    Cases
+    -----
+    - Lookups follow PATH order, skipping empty, duplicate and non-executable entries
+    - Duplicated and shadowed executables
+    - Lookups don't rescan until a PATH directory or PATH itself changes
+    - which() with a path to an executable
+    """
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    for directory in (first, second):
+        program = directory / "tool"
+        program.write_text("#!/bin/sh\n")
+        program.chmod(0o755)
+    (second / "other").write_text("#!/bin/sh\n")
+    (second / "other").chmod(0o755)
+    (second / "not-executable").write_text("")
+    (second / "not-executable").chmod(0o644)
+
+    monkeypatch.setenv("PATH", os.pathsep.join([str(first), "", str(second), str(first)]))
+    executables = ExecutableIndex(ttl=0)
+    assert executables.which("tool") == str(first / "tool")
+    assert executables.which("other") == str(second / "other")
+    assert executables.which("not-executable") is None
+    assert executables.which("missing") is None
+    assert "tool" in executables and len(executables) == 2
+    assert executables.directories == [str(first), str(second)]
+    assert executables.duplicates() == {"tool": [str(first / "tool"), str(second / "tool")]}
+    assert executables.shadowed() == {str(second / "tool"): str(first / "tool")}
+    assert executables.rebuilds == 1
+
+    # Lookups don't rescan until something changes
+    executables.which("tool")
+    assert executables.rebuilds == 1
+
+    # Removing a file changes the directory mtime
+    (first / "tool").unlink()
+    os.utime(first, ns=(0, 0)) # Guarantee a different mtime on coarse filesystems
+    assert executables.which("tool") == str(second / "tool")
+    assert executables.rebuilds == 2
+
+    # Changing PATH rebuilds the index
+    monkeypatch.setenv("PATH", str(first))
+    assert executables.which("other") is None
+    assert executables.rebuilds == 3
+
+    assert which(str(second / "other")) == str(second / "other")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Writes to the windows registry")
+def test_add_many_to_path(tmp_path, monkeypatch):
+    """Validates that add_many_to_path() exports new paths in ~/.bashrc with one write.
+
+    Cases
+    -----
+    - Paths already exported in the rc file and repeated paths are skipped
+    - The PATH of the current process is updated
+    - Adding the same paths again changes nothing (including through add_to_path())
+    - Paths only on the PATH of the current process are still exported
+    - The current process gets the new paths in the same order as the exports
+    - Nothing is written if any path is invalid
+    """
+    home = tmp_path / "home"
+    home.mkdir()
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (home / ".bashrc").write_text(f'alias ll="ls -l"\nexport PATH="{second}:$PATH"\n')
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("PATH", "/usr/bin")
+
+    # Already exported paths and repeats are skipped
+    assert add_many_to_path([str(first), str(second), str(first)]) == [str(first)]
+    contents = (home / ".bashrc").read_text()
+    assert contents.startswith('alias ll="ls -l"\n')
+    assert contents.count(f'export PATH="{first}:$PATH"') == 1
+    assert contents.count(f'export PATH="{second}:$PATH"') == 1
+    assert os.environ["PATH"].split(os.pathsep) == [str(first), "/usr/bin"]
+
+    # Idempotent
+    assert add_many_to_path([str(first), str(second)]) == []
+    assert (home / ".bashrc").read_text() == contents
+    add_to_path(str(first))
+    assert (home / ".bashrc").read_text() == contents
+
+    # Being on PATH for this process only doesn't make it permanent, and the process gets the same order as the exports
+    third, fourth = tmp_path / "third", tmp_path / "fourth"
+    third.mkdir()
+    fourth.mkdir()
+    monkeypatch.setenv("PATH", os.pathsep.join([str(third), "/usr/bin"]))
+    assert add_many_to_path([str(third), str(fourth)]) == [str(third), str(fourth)]
+    contents = (home / ".bashrc").read_text()
+    assert contents.count(f'export PATH="{third}:$PATH"') == 1
+    assert contents.index(f'export PATH="{third}:$PATH"') < contents.index(f'export PATH="{fourth}:$PATH"') # So fourth ends up first
+    assert os.environ["PATH"].split(os.pathsep) == [str(fourth), str(third), "/usr/bin"]
+
+    # Nothing is written if any path is invalid
+    with pytest.raises(ValueError):
+        add_many_to_path([str(tmp_path), str(tmp_path / "missing")])
+    assert (home / ".bashrc").read_text() == contents
+    assert sorted(os.listdir(home)) == [".bashrc"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Compacts the rc file on *nix only")
+def test_compact_path(tmp_path, monkeypatch):
+    """Validates that compact_path() removes redundant PATH directories and rc file exports.
+
+    Cases
+    -----
+    - Duplicate (including trailing separator), missing and empty directories are removed
+    - Dry runs don't change PATH or the rc file
+    - Busier directories are moved first
+    - Redundant exports are removed from the rc file, along with the blank line before them
+    """
+    home = tmp_path / "home"
+    home.mkdir()
+    busy, quiet, empty = tmp_path / "busy", tmp_path / "quiet", tmp_path / "empty"
+    for directory in (busy, quiet, empty):
+        directory.mkdir()
+    (busy / "tool").write_text("")
+    (quiet / "tool").write_text("")
+    missing = tmp_path / "missing"
+    rc = f'alias ll="ls -l"\n\nexport PATH="{quiet}:$PATH"\n\nexport PATH="{missing}:$PATH"\n\nexport PATH="{quiet}:$PATH"\n\nexport PATH="{empty}:$PATH"\n'
+    (home / ".bashrc").write_text(rc)
+    monkeypatch.setenv("HOME", str(home))
+    path = [str(quiet), "", str(missing), str(busy), f"{quiet}/", str(empty), str(busy)]
+    monkeypatch.setenv("PATH", os.pathsep.join(path))
+
+    # Dry run
+    assert compact_path(apply=False) == [str(quiet), str(busy)]
+    assert os.environ["PATH"] == os.pathsep.join(path)
+    assert (home / ".bashrc").read_text() == rc
+
+    assert compact_path(usage={str(busy): 10}) == [str(busy), str(quiet)]
+    assert os.environ["PATH"] == os.pathsep.join([str(busy), str(quiet)])
+    assert (home / ".bashrc").read_text() == f'alias ll="ls -l"\n\nexport PATH="{quiet}:$PATH"\n'
+
+
+def test_tree_stats(tmp_path):
+    """Validates the per directory totals of tree_stats().
+
+    Cases
+    -----
+    - Files, directories, size and disk usage of each directory (hidden files included)
+    - Hard linked files are only counted once
+    - Excluded directories are skipped
+    - Nested roots are counted under their outermost root
+    - Closing the generator early stops the scan
+    """
+    root = tmp_path / "root"
+    (root / "sub" / "deeper").mkdir(parents=True)
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "package.js").write_text("x" * 1000)
+    (root / "a.txt").write_text("x" * 10)
+    (root / ".hidden").write_text("x" * 5)
+    (root / "sub" / "b.txt").write_text("x" * 100)
+    os.link(root / "sub" / "b.txt", root / "sub" / "deeper" / "b-link.txt") # Only counted once
+
+    stats = {result.path: result for result in tree_stats([str(root / "sub"), str(root)], workers=4, exclude=["node_modules"])}
+    assert set(stats) == {str(root), str(root / "sub"), str(root / "sub" / "deeper")}
+    assert stats[str(root)][2:5] == (2, 1, 15)
+    assert sum(result.files for result in stats.values()) == 3
+    assert sum(result.size for result in stats.values()) == 115
+    assert all(result.disk_usage >= 0 for result in stats.values())
+    assert {result.root for result in stats.values()} == {str(root)}
+
+    totals = {}
+    for _ in range(5): # Attribution doesn't depend on which scan finishes first
+        for result in tree_stats([str(root), str(root / "sub")], workers=4, exclude=["node_modules"]):
+            totals[result.root] = totals.get(result.root, 0) + result.size
+        assert totals == {str(root): 115}
+        totals.clear()
+
+    # Stopping early doesn't leave scans running
+    results = tree_stats([str(root)])
+    next(results)
+    results.close()